@@ -35,6 +35,7 @@ Operators
 * lale_autoai.autoai_ts_libs. `MT2RForecaster`_
 * lale_autoai.autoai_ts_libs. `next`_
 * lale_autoai.autoai_ts_libs. `previous`_
+* lale_autoai.autoai_ts_libs. `Resample`_
 * lale_autoai.autoai_ts_libs. `SmallDataWindowTargetTransformer`_
 * lale_autoai.autoai_ts_libs. `StandardRowMeanCenter`_
 * lale_autoai.autoai_ts_libs. `StandardRowMeanCenterMTS`_
@@ -67,6 +68,7 @@ Operators
 .. _`MT2RForecaster`: lale_autoai.autoai_ts_libs.mt2r_forecaster.html
 .. _`next`: lale_autoai.autoai_ts_libs.next.html
 .. _`previous`: lale_autoai.autoai_ts_libs.previous.html
+.. _`Resample`: lale_autoai.autoai_ts_libs.resample.html
 .. _`SmallDataWindowTargetTransformer`: lale_autoai.autoai_ts_libs.small_data_window_target_transformer.html
 .. _`StandardRowMeanCenter`: lale_autoai.autoai_ts_libs.standard_row_mean_center.html
 .. _`StandardRowMeanCenterMTS`: lale_autoai.autoai_ts_libs.standard_row_mean_center_mts.html
@@ -102,6 +104,7 @@ from .localized_flatten_auto_ensembler import LocalizedFlattenAutoEnsembler
 from .mt2r_forecaster import MT2RForecaster
 from .next import next
 from .previous import previous
+from .resample import Resample
 from .small_data_window_target_transformer import SmallDataWindowTargetTransformer
 from .small_data_window_transformer import SmallDataWindowTransformer
 from .standard_row_mean_center import StandardRowMeanCenter
@@ -123,3 +126,14 @@ from .windowed_nn import WindowedNN
 from .windowed_pca import WindowedPCA
 from .windowed_lof import WindowedLOF
 
+
+import lale.operators as _lale_operators
+
+from ..columnar import accept_columnar as _accept_columnar
+from ..profiling import instrument as _instrument
+
+for _op in list(globals().values()):
+    if isinstance(_op, _lale_operators.IndividualOp):
+        if _op.impl_class.__module__.startswith(__name__):
+            _accept_columnar(_op.impl_class)
+            _instrument(_op.impl_class)
@@ -0,0 +1,109 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Column-selection pushdown for the pipelines in this package.
+
+Only the first step of a pipeline sees the columns of the pipeline input;
+the later steps see the output of the steps before them. When the first
+step names every column it reads through its column hyperparameters, the
+pipeline input is cut down to those columns once, at the pipeline entry,
+and the indices of the step are remapped to the narrower input, so unused
+columns of wide inputs are never copied by the windowing steps.
+"""
+
+import lale.operators
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, clone
+
+_LIST_PARAMS = ("feature_columns", "target_columns", "look_ahead_fcolumns")
+_COLUMN_PARAMS = _LIST_PARAMS + ("time_column",)
+
+
+def _column_params(step):
+    if isinstance(step, lale.operators.IndividualOp):
+        params = {**step.get_defaults(), **step.hyperparams()}
+    elif isinstance(step, BaseEstimator):
+        params = step.get_params(deep=False)
+    else:
+        return None
+    return {k: params[k] for k in _COLUMN_PARAMS if k in params}
+
+
+def _with_params(step, params):
+    if isinstance(step, lale.operators.IndividualOp):
+        return step(**{**step.hyperparams(), **params})
+    return clone(step).set_params(**params)
+
+
+def _used_columns(params):
+    """The columns named by params, or None if they include all columns."""
+    if not any(k in params for k in ("feature_columns", "target_columns")):
+        return None
+    columns = set()
+    for k in _LIST_PARAMS:
+        value = params.get(k)
+        if value is None and k == "look_ahead_fcolumns":
+            continue
+        if not isinstance(value, (list, tuple)) or any(c < 0 for c in value):
+            return None
+        columns.update(value)
+    time_column = params.get("time_column")
+    if time_column is not None and time_column >= 0:
+        columns.add(time_column)
+    return columns
+
+
+def _remap(params, position):
+    result = {}
+    for k, value in params.items():
+        if k == "time_column":
+            result[k] = position[value] if value is not None and value >= 0 else value
+        elif value is not None:
+            result[k] = [position[c] for c in value]
+    return result
+
+
+def plan(steps):
+    """The sorted columns the pipeline reads and the steps remapped to them,
+    or None if the first step may read any column."""
+    if not steps:
+        return None
+    name, first = steps[0]
+    params = _column_params(first)
+    columns = None if params is None else _used_columns(params)
+    if not columns:
+        return None
+    columns = sorted(columns)
+    position = {c: i for i, c in enumerate(columns)}
+    remapped = _with_params(first, _remap(params, position))
+    return columns, [(name, remapped)] + list(steps[1:])
+
+
+def applies(columns, X):
+    """Whether selecting columns from X leaves out any of its columns."""
+    n_columns = getattr(X, "shape", (0, 0))[1] if np.ndim(X) == 2 else 0
+    return len(columns) < n_columns and columns[-1] < n_columns
+
+
+def select(X, columns):
+    if X is None:
+        return None
+    if columns == list(range(columns[0], columns[-1] + 1)):
+        index = slice(columns[0], columns[-1] + 1)  # a view
+    else:
+        index = columns
+    if isinstance(X, pd.DataFrame):
+        return X.iloc[:, index]
+    return np.asarray(X)[:, index]
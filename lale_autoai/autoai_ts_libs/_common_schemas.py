@@ -173,3 +173,51 @@ def get_schema_two_steps(default: str) -> JSON_TYPE:
     }
 
 
+
+
+schema_dtype: JSON_TYPE = {
+    "description": """Floating point type of the computation. None delegates to autoai_ts_libs,
+which upcasts to float64; "float32" keeps every intermediate, including the noise
+added to constant rows, in single precision.""",
+    "anyOf": [
+        {"enum": ["float32", "float64"]},
+        {"enum": [None], "description": "Use the autoai_ts_libs implementation."},
+    ],
+    "default": None,
+}
+
+
+cost_model_windows: JSON_TYPE = {
+    "description": """Fit and transform cost, see lale_autoai.cost: the windows hold
+n_rows * lookback_window * n_columns cells, with lookback_window None counted as 1.
+Coefficients measured on 20000 rows with lookback_window 5 to 50.""",
+    "form": "windows",
+    "intercept_seconds": 0.002,
+    "seconds_per_unit": 2.5e-8,
+    "bytes_per_cell": 8,
+}
+
+
+cost_model_decomposition: JSON_TYPE = {
+    "description": """Fit cost, see lale_autoai.cost: a trend and a residual model per target
+column over n_rows rows. The trend and residual estimators measured within noise of
+each other, so the cost does not depend on them.""",
+    "form": "decomposition",
+    "intercept_seconds": 0.0,
+    "seconds_per_unit": 2e-4,
+    "bytes_per_cell": 8,
+}
+
+
+schema_fidelity: JSON_TYPE = {
+    "description": """Fraction of the training series to fit on, taken from its most recent
+rows, but at least the rows of one window. This is a fidelity for multi-fidelity searches
+such as Hyperband or BOHB, which fit many configurations at a low fidelity and only the
+promising ones on the whole series, and is marked as such by "fidelity": true.""",
+    "type": "number",
+    "minimum": 0.0,
+    "exclusiveMinimum": True,
+    "maximum": 1.0,
+    "default": 1.0,
+    "fidelity": True,
+}
@@ -0,0 +1,100 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Post-fit compaction of the auto-ensemblers.
+
+After fit, the AutoRegression search inside the ensemble step of a flatten
+auto-ensembler still holds every pipeline it explored with its score and the
+paths of its search graph, although predict only uses the ensemble of the
+n_leaders_for_ensemble leaders, and with store_lookback_history the model
+holds the whole training series, although predict without X only reads its
+last window.
+"""
+
+import pickle
+
+import numpy as np
+
+# fitted attributes of AutoRegression that predict does not read; its
+# constructor arguments are kept so that get_params and clone still work
+_SEARCH_ARTIFACTS = (
+    "explored_estimator",
+    "explored_score",
+    "best_path_info",
+    "_top_k_paths",
+    "_top_k_bottom_nodes",
+    "bayesian_paramgrid",
+    "rbopt_paramgrid",
+)
+
+_UNUSED_ENSEMBLE = {
+    "voting": "stacked_ensemble_estimator",
+    "stacked": "voting_ensemble_estimator",
+}
+
+
+def size_bytes(obj):
+    """The size of obj pickled, as when a model is saved or shipped."""
+    return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _emptied(value):
+    return type(value)() if isinstance(value, (list, tuple, dict)) else None
+
+
+def _drop_search_artifacts(ensemble):
+    search = getattr(ensemble, "auto_regression", None)
+    if search is None:
+        return
+    names = _SEARCH_ARTIFACTS
+    unused = _UNUSED_ENSEMBLE.get(getattr(ensemble, "ensemble_type", None))
+    if unused is not None:
+        names += (unused,)
+    for name in names:
+        if getattr(search, name, None) is not None:
+            setattr(search, name, _emptied(getattr(search, name)))
+
+
+def _forecast_from_history(model):
+    try:
+        return np.asarray(model.predict(None))
+    except Exception:
+        return None
+
+
+def _trim_lookback_history(model, n_rows):
+    """Keep the last n_rows of the stored lookback history, unless that
+    changes the forecast from the history or there is no such forecast to
+    check against."""
+    history = getattr(model, "lookback_data_X", None)
+    if history is None or len(history) <= n_rows:
+        return
+    expected = _forecast_from_history(model)
+    if expected is None:
+        return
+    model.lookback_data_X = np.array(history[-n_rows:])
+    forecast = _forecast_from_history(model)
+    if forecast is None or not np.allclose(forecast, expected, equal_nan=True):
+        model.lookback_data_X = history
+
+
+def compact(model, n_rows, measure=False):
+    """Drop the search artifacts of a fitted backend auto-ensembler and cut
+    its lookback history down to n_rows. If measure, returns the bytes
+    freed, which takes pickling the model before and after; else None."""
+    before = size_bytes(model) if measure else None
+    _trim_lookback_history(model, n_rows)
+    for _, step in getattr(model, "steps", []):
+        _drop_search_artifacts(step)
+    return before - size_bytes(model) if measure else None
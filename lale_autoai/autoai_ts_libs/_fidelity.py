@@ -0,0 +1,47 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Training on the most recent fraction of a series, for the fidelity
+hyperparameter of the forecasters and windowed anomaly detectors."""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def _tail(a, n_rows):
+    if a is None:
+        return None
+    if isinstance(a, (pd.DataFrame, pd.Series)):
+        return a.iloc[-n_rows:]
+    return np.asarray(a)[-n_rows:]
+
+
+def window_rows(*lengths):
+    """The rows needed for one window of the given lengths; lengths that
+    are not integers, such as "auto", count as 0."""
+    return sum(n for n in lengths if isinstance(n, int) and n > 0) + 1
+
+
+def most_recent(fidelity, X, y=None, min_rows=1):
+    """X and y cut down to their last ceil(fidelity * len(X)) rows, but to
+    no fewer than min_rows."""
+    if fidelity >= 1.0 or X is None:
+        return X, y
+    n_rows = len(X)
+    keep = min(n_rows, max(math.ceil(fidelity * n_rows), min_rows))
+    if keep == n_rows:
+        return X, y
+    return _tail(X, keep), _tail(y, keep)
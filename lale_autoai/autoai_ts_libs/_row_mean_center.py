@@ -0,0 +1,234 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Numpy kernels for the row-mean-center and window transformers.
+
+They reproduce the semantics of
+autoai_ts_libs.sklearn.small_data_standard_row_mean_center_transformers,
+but keep every intermediate in the requested floating point dtype instead
+of upcasting to float64.
+"""
+
+import numpy as np
+
+_SEED = 42
+_SEED_HIGH = 1000000
+_ROW_BLOCK = 8192
+_CANCELLATION_TOL = 1e-6
+
+
+def as_2d(X, dtype, copy=False):
+    X = np.array(X, dtype=dtype, copy=copy)
+    if X.ndim == 1:
+        X = X.reshape(-1, 1)
+    return X
+
+
+def child_rngs(rng, n):
+    return [np.random.default_rng(s) for s in rng.integers(0, _SEED_HIGH, n)]
+
+
+def lagged_windows(X, lookback_window):
+    """One row per time point; the first rows of each lag are padded with
+    the mean of the shifted column."""
+    n, k = X.shape
+    W = np.empty((n, k * lookback_window), dtype=X.dtype)
+    for j in range(k):
+        for l in range(lookback_window):
+            lag = lookback_window - 1 - l
+            col = W[:, j * lookback_window + l]
+            shifted = X[: n - lag, j]
+            col[lag:] = shifted
+            col[:lag] = shifted.mean() if len(shifted) > 0 else 0
+    return W
+
+
+def target_windows(y, lookback_window, prediction_horizon, n_windows):
+    """The prediction_horizon values of each column of y that follow each of
+    the first n_windows complete windows."""
+    Y = np.empty((n_windows, y.shape[1] * prediction_horizon), dtype=y.dtype)
+    for j in range(y.shape[1]):
+        for l in range(prediction_horizon):
+            start = lookback_window + l
+            Y[:, j * prediction_horizon + l] = y[start : start + n_windows, j]
+    return Y
+
+
+def supervised_windows(X, y, lookback_window, prediction_horizon):
+    """Complete windows of X ending at t and the next prediction_horizon
+    values of y, for t = lookback_window - 1, ..., n - 1 - prediction_horizon."""
+    n, k = X.shape
+    m = max(n - lookback_window - prediction_horizon + 1, 0)
+    W = np.empty((m, k * lookback_window), dtype=X.dtype)
+    for j in range(k):
+        for l in range(lookback_window):
+            W[:, j * lookback_window + l] = X[l : l + m, j]
+    return W, target_windows(y, lookback_window, prediction_horizon, m)
+
+
+def row_stats(W):
+    mu = W.mean(axis=1, keepdims=True)
+    std = W.std(axis=1, keepdims=True)
+    zero_std_idx = np.where(std == 0)[0]
+    std[zero_std_idx] = 1
+    return mu, std, zero_std_idx
+
+
+def center_rows(W, mu, std, zero_std_idx, rng, add_noise=True, noise_var=1e-5):
+    """Standardize the rows of W in place; rows with zero standard deviation
+    get Gaussian jitter drawn in W's dtype."""
+    W -= mu
+    W /= std
+    if add_noise and len(zero_std_idx) > 0:
+        shape = (len(zero_std_idx), W.shape[1])
+        noise = rng.standard_normal(shape, dtype=W.dtype)
+        noise *= W.dtype.type(noise_var)
+        W[zero_std_idx] += noise
+    return W
+
+
+def rolling_stats(x, lookback_window):
+    """Mean and standard deviation of every complete window of x.
+
+    The sums come from float64 cumulative sums taken around the mean of x,
+    so x should be a block of moderate length rather than a whole series.
+    Windows whose variance is within the rounding error of those sums are
+    recomputed directly with a two-pass computation, and constant windows
+    get a standard deviation of exactly zero."""
+    L = lookback_window
+    shift = x.mean(dtype=np.float64)
+    d = np.subtract(x, shift, dtype=np.float64)
+    c = np.zeros(len(x) + 1)
+    np.cumsum(d, out=c[1:])
+    s = c[L:] - c[:-L]
+    np.square(d, out=d)
+    np.cumsum(d, out=c[1:])
+    ss = c[L:] - c[:-L]
+    ss -= s * s / L
+    suspect = np.flatnonzero(ss <= _CANCELLATION_TOL * c[-1])
+    s /= L
+    s += shift
+    np.maximum(ss, 0, out=ss)
+    ss /= L
+    mu, std = s.astype(x.dtype), np.sqrt(ss).astype(x.dtype)
+    if len(suspect) > 0:
+        windows = np.lib.stride_tricks.sliding_window_view(x, L)[suspect]
+        mu[suspect] = windows.mean(axis=1)
+        std[suspect] = windows.std(axis=1)
+        constant = np.ptp(windows, axis=1) == 0
+        mu[suspect[constant]] = windows[constant, 0]
+        std[suspect[constant]] = 0
+    return mu, std
+
+
+def _padded_head(x, lookback_window, n_rows):
+    """The first n_rows lagged windows of x, which still contain padding."""
+    n = len(x)
+    H = np.empty((n_rows, lookback_window), dtype=x.dtype)
+    for l in range(lookback_window):
+        lag = lookback_window - 1 - l
+        H[:, l] = x[: n - lag].mean() if n > lag else 0
+        H[lag:, l] = x[: max(n_rows - lag, 0)]
+    return H
+
+
+def window_center(
+    X,
+    y,
+    lookback_window,
+    prediction_horizon,
+    rngs,
+    out=None,
+    add_noise=True,
+    noise_var=1e-5,
+):
+    """Windows of each column of X, standardized row by row per column.
+
+    Without y there is one (padded) window per time point, otherwise the
+    complete windows with their prediction_horizon targets, which are
+    standardized with the statistics of the window they follow.
+
+    Rows are processed in blocks: the statistics of a block come from
+    rolling_stats and its centered windows are written straight into out,
+    which is allocated if not given, so the raw windows are never
+    materialized."""
+    n, k = X.shape
+    L = lookback_window
+    padded = y is None
+    m = n if padded else max(n - L - prediction_horizon + 1, 0)
+    if out is None:
+        out = np.empty((m, k * L), dtype=X.dtype)
+    elif out.shape != (m, k * L) or out.dtype != X.dtype:
+        raise ValueError(
+            "out must have shape %s and dtype %s, got %s and %s."
+            % ((m, k * L), X.dtype, out.shape, out.dtype)
+        )
+    Y = None if padded else target_windows(y, L, prediction_horizon, m)
+    head = min(L - 1, n) if padded else 0
+    bounds = [(0, head)] if head > 0 else []
+    bounds += [(lo, min(lo + _ROW_BLOCK, m)) for lo in range(head, m, _ROW_BLOCK)]
+    stats = []
+    for j, rng in enumerate(rngs):
+        x = np.ascontiguousarray(X[:, j])
+        block = out[:, j * L : (j + 1) * L]
+        mu = np.empty((m, 1), dtype=X.dtype)
+        std = np.empty((m, 1), dtype=X.dtype)
+        zero_std_idx = [np.empty(0, dtype=int)]
+        for lo, hi in bounds:
+            if lo < head:
+                windows = _padded_head(x, L, head)
+                mu[lo:hi, 0] = windows.mean(axis=1)
+                std[lo:hi, 0] = windows.std(axis=1)
+            else:
+                segment = x[lo - head : hi - head + L - 1]
+                windows = np.lib.stride_tricks.sliding_window_view(segment, L)
+                mu[lo:hi, 0], std[lo:hi, 0] = rolling_stats(segment, L)
+            zero = lo + np.flatnonzero(std[lo:hi] == 0)
+            std[zero] = 1
+            zero_std_idx.append(zero)
+            np.subtract(windows, mu[lo:hi], out=block[lo:hi])
+            block[lo:hi] /= std[lo:hi]
+        zero_std_idx = np.concatenate(zero_std_idx)
+        if add_noise and len(zero_std_idx) > 0:
+            noise = rng.standard_normal((len(zero_std_idx), L), dtype=X.dtype)
+            noise *= X.dtype.type(noise_var)
+            block[zero_std_idx] += noise
+        if Y is not None and j < y.shape[1]:
+            h = prediction_horizon
+            target = Y[:, j * h : (j + 1) * h]
+            target -= mu
+            target /= std
+        stats.append((mu, std))
+    return out, Y, stats
+
+
+def inverse_center(y, stats, width, dtype):
+    """Undo the standardization of y. As in the backend's inverse_transform,
+    column j of y belongs to target j; y may instead hold the width columns
+    per target of the transformed targets, one block after the other."""
+    y = as_2d(y, dtype, copy=True)
+    n_columns = y.shape[1]
+    if n_columns > len(stats):
+        if n_columns != len(stats) * width:
+            raise ValueError(
+                "Expected at most %d or exactly %d columns, got %d."
+                % (len(stats), len(stats) * width, n_columns)
+            )
+    else:
+        width = 1
+    for j, (mu, std) in enumerate(stats[: n_columns // width]):
+        block = y[:, j * width : (j + 1) * width]
+        block *= std
+        block += mu
+    return y
@@ -0,0 +1,55 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Memory-mapped scratch arrays that joblib hands to worker processes by
+file name instead of serializing them once per task."""
+
+import contextlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+def _shm_fits(nbytes):
+    try:
+        return shutil.disk_usage("/dev/shm").free >= nbytes
+    except OSError:
+        return False
+
+
+@contextlib.contextmanager
+def scratch_folder(nbytes):
+    """A temporary folder for nbytes of arrays, removed on exit. As in
+    joblib, it is in /dev/shm where that has the free space, which a
+    container's small default shm often lacks, and in the temp dir
+    otherwise."""
+    shm = "/dev/shm" if _shm_fits(nbytes) else None
+    folder = tempfile.mkdtemp(prefix="lale_autoai_", dir=shm)
+    try:
+        yield folder
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def share(folder, name, a, fortran_order=False):
+    """Copy a into an npy file in folder and map it back read-only."""
+    path = os.path.join(folder, name + ".npy")
+    shared = np.lib.format.open_memmap(
+        path, mode="w+", dtype=a.dtype, shape=a.shape, fortran_order=fortran_order
+    )
+    shared[:] = a
+    del shared
+    return np.load(path, mmap_mode="r")
@@ -0,0 +1,152 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-step timings of the pipelines in this package.
+
+When a pipeline is given a timing_callback, the steps it hands to the
+autoai_ts_libs pipeline are wrapped in TimedStep estimators, which forward every attribute to the step and clone, with
+get_params and set_params, as a TimedStep of the cloned step. While a
+pipeline call collects timings on the current thread, each step call records
+its duration and, for lale_autoai operators, how much of it was spent inside
+the operator implementation; the rest is the schema validation and input
+conversion lale does around it.
+"""
+
+import contextlib
+import functools
+import threading
+import time
+
+from sklearn.base import BaseEstimator, clone
+
+from ..profiling import PROFILED_METHODS, operator_name, profile
+
+_TIMED_METHODS = frozenset(PROFILED_METHODS) | {"fit_transform"}
+
+_local = threading.local()
+
+
+class TimedStep(BaseEstimator):
+    def __init__(self, name, step):
+        self._name = name
+        self._step = step
+
+    def get_params(self, deep=True):
+        params = {"name": self._name, "step": self._step}
+        if deep and hasattr(self._step, "get_params"):
+            for key, value in self._step.get_params(deep=True).items():
+                params["step__" + key] = value
+        return params
+
+    def set_params(self, **params):
+        nested = {}
+        for key, value in params.items():
+            if key == "name":
+                self._name = value
+            elif key == "step":
+                self._step = value
+            elif key.startswith("step__"):
+                nested[key[len("step__") :]] = value
+            else:
+                raise ValueError(f"Invalid parameter {key!r} for TimedStep.")
+        if nested:
+            step = self._step.set_params(**nested)
+            if step is not None:
+                self._step = step
+        return self
+
+    def __sklearn_clone__(self):
+        return TimedStep(self._name, clone(self._step, safe=False))
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name in ("_name", "_step"):
+            raise AttributeError(name)
+        attr = getattr(self._step, name)
+        if name in _TIMED_METHODS and callable(attr):
+            return functools.partial(self._timed, name, attr)
+        return attr
+
+    def __repr__(self):
+        return repr(self._step)
+
+    def _timed(self, method_name, method, *args, **kwargs):
+        steps = getattr(_local, "steps", None)
+        if steps is None:
+            result = method(*args, **kwargs)
+        else:
+            thread = threading.get_ident()
+            with profile() as p:
+                start = time.perf_counter()
+                result = method(*args, **kwargs)
+                seconds = time.perf_counter() - start
+            impl_class = getattr(self._step, "impl_class", None)
+            operator = None if impl_class is None else operator_name(impl_class)
+            own = [
+                r["wall_seconds"]
+                for r in p.records
+                if r["thread"] == thread and r["operator"] == operator
+            ]
+            impl_seconds = max(own) if own else None
+            steps.append(
+                {
+                    "name": self._name,
+                    "method": method_name,
+                    "seconds": seconds,
+                    "impl_seconds": impl_seconds,
+                    "validation_seconds": (
+                        None if impl_seconds is None else seconds - impl_seconds
+                    ),
+                }
+            )
+        if method_name == "fit" and result is not None and result is not self._step:
+            return TimedStep(self._name, result)
+        return result
+
+
+def wrap_steps(steps, timing_callback):
+    """The steps, wrapped in TimedStep estimators if timings are requested."""
+    if timing_callback is None:
+        return steps
+    return [
+        (name, step if isinstance(step, TimedStep) else TimedStep(name, step))
+        for name, step in steps
+    ]
+
+
+@contextlib.contextmanager
+def collect_timings(method, callback):
+    """Collect the timings of the proxied step calls made on this thread
+    inside the with block into the yielded dict, which callback gets after
+    the block; the time of the block not spent in any step is reported as
+    conversion_seconds. Without a callback, nothing is collected and the
+    yielded value is None."""
+    if callback is None:
+        yield None
+        return
+    timings = {"method": method, "steps": []}
+    outer = getattr(_local, "steps", None)
+    _local.steps = timings["steps"]
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        _local.steps = outer
+    timings["seconds"] = time.perf_counter() - start
+    timings["conversion_seconds"] = timings["seconds"] - sum(
+        s["seconds"] for s in timings["steps"]
+    )
+    timings["validation_seconds"] = sum(
+        s["validation_seconds"] or 0.0 for s in timings["steps"]
+    )
+    callback(timings)
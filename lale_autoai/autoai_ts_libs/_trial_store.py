@@ -0,0 +1,145 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""SQLite store of the scores of pipelines evaluated by a search, keyed on
+a fingerprint of the data, a canonical form of the search settings that
+determine the scores (the metric, the cross-validation and the time allowed
+per pipeline) and a canonical form of the pipeline configuration.
+
+The unfitted pipelines are stored pickled and unpickled by leaders, which
+runs arbitrary code from the file; only use a store file from a trusted
+source.
+"""
+
+import contextlib
+import hashlib
+import pickle
+import sqlite3
+import time
+
+import numpy as np
+from sklearn.base import BaseEstimator, clone
+
+_SCHEMA = """CREATE TABLE IF NOT EXISTS trials (
+    fingerprint TEXT NOT NULL,
+    search TEXT NOT NULL,
+    config TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    score REAL NOT NULL,
+    estimator BLOB NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (fingerprint, search, config)
+)"""
+
+_COLUMNS = ["fingerprint", "search", "config", "metric", "score", "estimator", "created"]
+
+
+def dataset_fingerprint(X, y=None):
+    h = hashlib.sha256()
+    for a in (X, y):
+        if a is None:
+            h.update(b"None")
+            continue
+        a = np.ascontiguousarray(np.asarray(a))
+        h.update(repr((a.shape, a.dtype.str)).encode())
+        if a.dtype.hasobject:
+            h.update(repr(a.tolist()).encode())
+        else:
+            h.update(a.data)
+    return h.hexdigest()
+
+
+def _canonical(value):
+    if isinstance(value, BaseEstimator):
+        params = value.get_params(deep=False)
+        items = ", ".join("%s=%s" % (k, _canonical(params[k])) for k in sorted(params))
+        return "%s(%s)" % (type(value).__qualname__, items)
+    if isinstance(value, (list, tuple)):
+        return "[%s]" % ", ".join(_canonical(v) for v in value)
+    if isinstance(value, dict):
+        return "{%s}" % ", ".join(
+            "%r: %s" % (k, _canonical(value[k])) for k in sorted(value)
+        )
+    if callable(value) and hasattr(value, "__qualname__"):
+        return "%s.%s" % (value.__module__, value.__qualname__)
+    return repr(value)
+
+
+def config_key(estimator):
+    """Canonical text of the configuration of an unfitted estimator, which
+    unlike repr is not abbreviated and does not depend on defaults."""
+    return _canonical(estimator)
+
+
+class TrialStore:
+    """The trials in the SQLite file at path of searches with the given
+    settings, a dict that must include the "scoring" of the search."""
+
+    def __init__(self, path, search):
+        self._path = path
+        self._search = _canonical(search)
+        self._metric = _canonical(search["scoring"])
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(trials)")]
+        if columns != _COLUMNS:
+            raise ValueError(
+                f"{path} holds a trials table of an older format; use a new file."
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        with contextlib.closing(sqlite3.connect(self._path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    def put(self, fingerprint, estimator, score):
+        blob = pickle.dumps(clone(estimator))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    fingerprint,
+                    self._search,
+                    config_key(estimator),
+                    self._metric,
+                    float(score),
+                    blob,
+                    time.time(),
+                ),
+            )
+
+    def configs(self, fingerprint):
+        """The keys of the configurations already evaluated on fingerprint."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT config FROM trials WHERE fingerprint = ? AND search = ?",
+                (fingerprint, self._search),
+            ).fetchall()
+        return {config for (config,) in rows}
+
+    def leaders(self, fingerprint, k=None):
+        """The k best (score, unfitted estimator) pairs evaluated on
+        fingerprint, best first."""
+        query = (
+            "SELECT score, estimator FROM trials"
+            " WHERE fingerprint = ? AND search = ? ORDER BY score DESC"
+        )
+        params = (fingerprint, self._search)
+        if k is not None:
+            query += " LIMIT ?"
+            params += (k,)
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [(score, pickle.loads(blob)) for score, blob in rows]
@@ -16,17 +16,195 @@ from autoai_ts_libs.srom.joint_optimizers.auto.auto_regression import (  # type:
     AutoRegression as model_to_be_wrapped,
 )
 
+import itertools
+
+from sklearn.pipeline import Pipeline
+
 import lale.docstrings
 import lale.operators
 
+from ._trial_store import TrialStore, config_key, dataset_fingerprint
+
+
+class _AutoRegressionImpl:
+    def __init__(
+        self,
+        level="Early",
+        save_prefix="auto_regression_output_",
+        execution_platform="spark_node_random_search",
+        cv=5,
+        scoring=None,
+        stages=None,
+        execution_time_per_pipeline=2,
+        num_options_per_pipeline_for_random_search=10,
+        num_option_per_pipeline_for_intelligent_search=30,
+        total_execution_time=10,
+        param_grid=None,
+        execution_round=1,
+        trial_store=None,
+        warm_start=False,
+        **kwargs,
+    ):
+        self._hyperparams = {
+            "level": level,
+            "save_prefix": save_prefix,
+            "execution_platform": execution_platform,
+            "cv": cv,
+            "scoring": scoring,
+            "stages": stages,
+            "execution_time_per_pipeline": execution_time_per_pipeline,
+            "num_options_per_pipeline_for_random_search": num_options_per_pipeline_for_random_search,
+            "num_option_per_pipeline_for_intelligent_search": num_option_per_pipeline_for_intelligent_search,
+            "total_execution_time": total_execution_time,
+            "param_grid": param_grid,
+            "execution_round": execution_round,
+            **kwargs,
+        }
+        self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
+        self._trial_store = trial_store
+        self._warm_start = warm_start
+
+    def _all_evaluated(self, configs):
+        stages = self._hyperparams["stages"]
+        if not stages or self._hyperparams["param_grid"] is not None:
+            return False
+        return all(
+            config_key(Pipeline(list(path))) in configs
+            for path in itertools.product(*stages)
+        )
+
+    def fit(self, X, y):
+        if self._trial_store is None:
+            self._wrapped_model.fit(X, y)
+            return self
+        model = self._wrapped_model
+        store = TrialStore(
+            self._trial_store,
+            {
+                name: self._hyperparams[name]
+                for name in ("scoring", "cv", "execution_time_per_pipeline")
+            },
+        )
+        fingerprint = dataset_fingerprint(X, y)
+        leaders = store.leaders(fingerprint) if self._warm_start else []
+        if leaders:
+            model.explored_score = [score for score, _ in leaders]
+            model.explored_estimator = [estimator for _, estimator in leaders]
+            model.best_score_so_far, model.best_estimator_so_far = leaders[0]
+        if leaders and self._all_evaluated(store.configs(fingerprint)):
+            model.best_estimator_so_far.fit(X, y)
+            return self
+        model.fit(X, y)
+        for estimator, score in zip(model.explored_estimator, model.explored_score):
+            store.put(fingerprint, estimator, score)
+        return self
+
+    def predict(self, X=None):
+        return self._wrapped_model.predict(X)
+
+    def predict_proba(self, X=None):
+        return self._wrapped_model.predict_proba(X)
+
+
 _hyperparams_schema = {
     "allOf": [
         {
             "description": "This first object lists all constructor arguments with their types, but omits constraints for conditional hyperparameters.",
             "type": "object",
             "additionalProperties": True,
+            "required": [
+                "level",
+                "execution_platform",
+                "cv",
+                "total_execution_time",
+                "trial_store",
+                "warm_start",
+            ],
             "relevantToOptimizer": [],
-            "properties": {},
+            "properties": {
+                "level": {
+                    "description": "Depth of the search over regression pipelines.",
+                    "type": "string",
+                    "default": "Early",
+                },
+                "save_prefix": {
+                    "description": "Prefix of the files in which the search results are saved.",
+                    "type": "string",
+                    "default": "auto_regression_output_",
+                },
+                "execution_platform": {
+                    "description": "Platform for execution of srom pipeline.",
+                    "type": "string",
+                    "default": "spark_node_random_search",
+                },
+                "cv": {
+                    "description": "Number of cross-validation folds used to score the candidate pipelines.",
+                    "type": "integer",
+                    "minimum": 2,
+                    "default": 5,
+                },
+                "scoring": {
+                    "description": "Scoring used to rank the candidate pipelines.",
+                    "anyOf": [{"laleType": "Any"}, {"enum": [None]}],
+                    "default": None,
+                },
+                "stages": {
+                    "description": "Stages of the pipelines to search over, each a list of (name, estimator) options.",
+                    "anyOf": [{"laleType": "Any"}, {"enum": [None]}],
+                    "default": None,
+                },
+                "execution_time_per_pipeline": {
+                    "description": "Maximum execution time per pipeline.",
+                    "type": "number",
+                    "default": 2,
+                },
+                "num_options_per_pipeline_for_random_search": {
+                    "description": "Number of hyperparameter settings tried per pipeline by random search.",
+                    "type": "integer",
+                    "minimum": 1,
+                    "default": 10,
+                },
+                "num_option_per_pipeline_for_intelligent_search": {
+                    "description": "Number of hyperparameter settings tried per pipeline by intelligent search.",
+                    "type": "integer",
+                    "minimum": 1,
+                    "default": 30,
+                },
+                "total_execution_time": {
+                    "description": "Approximate maximum runtime allowed.",
+                    "type": "number",
+                    "default": 10,
+                },
+                "param_grid": {
+                    "description": "Hyperparameter grid of the searched pipelines.",
+                    "anyOf": [{"laleType": "Any"}, {"enum": [None]}],
+                    "default": None,
+                },
+                "execution_round": {
+                    "description": "Number of rounds of the search.",
+                    "type": "integer",
+                    "minimum": 1,
+                    "default": 1,
+                },
+                "trial_store": {
+                    "description": """Path of an SQLite file recording the score of every pipeline the
+search evaluates, keyed on a fingerprint of X and y, the scoring, cv and
+execution_time_per_pipeline of the search and the pipeline configuration.
+The pipelines are stored pickled, so only use a file from a trusted source.""",
+                    "anyOf": [
+                        {"type": "string"},
+                        {"description": "Do not record trials.", "enum": [None]},
+                    ],
+                    "default": None,
+                },
+                "warm_start": {
+                    "description": """Seed the search with the trials recorded in trial_store for the
+same data and search settings, best first. If every pipeline of the stages was already evaluated, the
+search is skipped and the best recorded pipeline is refit.""",
+                    "type": "boolean",
+                    "default": False,
+                },
+            },
         }
     ]
 }
@@ -120,6 +298,6 @@ _combined_schemas = {
     },
 }
 
-AutoRegression = lale.operators.make_operator(model_to_be_wrapped, _combined_schemas)
+AutoRegression = lale.operators.make_operator(_AutoRegressionImpl, _combined_schemas)
 
 lale.docstrings.set_docstrings(AutoRegression)
@@ -19,19 +19,78 @@ from autoai_ts_libs.sklearn.autoai_ts_pipeline import (  # type: ignore # noqa
 import lale.docstrings
 import lale.operators
 
+from ..batching import batcher_for
+from ._column_pushdown import applies, plan, select
+from ._step_timing import collect_timings, wrap_steps
+
+
+def _with_dtype(step, dtype):
+    if isinstance(step, lale.operators.IndividualOp) and "dtype" in step.get_defaults():
+        return step(**{**step.hyperparams(), "dtype": dtype})
+    return step
+
 
 class _AutoaiTSPipelineImpl:
-    def __init__(self, steps, memory=None, verbose=False):
-        self._hyperparams = {"steps": steps, "memory": memory, "verbose": verbose}
-        kwargs = {"memory": memory, "verbose": verbose}
-        self._wrapped_model = model_to_be_wrapped(steps=steps, **kwargs)
+    def __init__(
+        self,
+        steps,
+        memory=None,
+        verbose=False,
+        dtype=None,
+        timing_callback=None,
+        column_pushdown=True,
+    ):
+        self._hyperparams = {
+            "steps": steps,
+            "memory": memory,
+            "verbose": verbose,
+            "dtype": dtype,
+            "timing_callback": timing_callback,
+            "column_pushdown": column_pushdown,
+        }
+        if dtype is not None:
+            steps = [(name, _with_dtype(step, dtype)) for name, step in steps]
+        self._steps = steps
+        self._kwargs = {"memory": memory, "verbose": verbose}
+        self._wrapped_model = model_to_be_wrapped(
+            steps=wrap_steps(steps, timing_callback), **self._kwargs
+        )
+        self._timing_callback = timing_callback
+        self._column_pushdown = column_pushdown
+        self._columns = None
+        self.last_timings_ = None
+
+    def _push_down_columns(self, X):
+        pushdown = plan(self._steps) if self._column_pushdown else None
+        columns = None
+        if pushdown is not None and applies(pushdown[0], X):
+            columns = pushdown[0]
+        if columns != self._columns:
+            steps = self._steps if columns is None else pushdown[1]
+            self._wrapped_model = model_to_be_wrapped(
+                steps=wrap_steps(steps, self._timing_callback),
+                **self._kwargs,
+            )
+            self._columns = columns
+        return X if columns is None else select(X, columns)
 
     def fit(self, X, y=None, **fit_params):
-        self._wrapped_model.fit(X, y, **fit_params)
+        with collect_timings("fit", self._timing_callback) as timings:
+            X = self._push_down_columns(X)
+            self._wrapped_model.fit(X, y, **fit_params)
+        self.last_timings_ = timings
         return self
 
     def predict(self, X=None, **predict_params):
-        return self._wrapped_model.predict(X, **predict_params)
+        if self._columns is not None and applies(self._columns, X):
+            X = select(X, self._columns)
+        with collect_timings("predict", self._timing_callback) as timings:
+            result = self._wrapped_model.predict(X, **predict_params)
+        self.last_timings_ = timings
+        return result
+
+    async def apredict(self, X=None, **predict_params):
+        return await batcher_for(self).submit(X, **predict_params)
 
 
 _hyperparams_schema = {
@@ -40,7 +99,14 @@ _hyperparams_schema = {
             "description": "This first object lists all constructor arguments with their types, but omits constraints for conditional hyperparameters.",
             "type": "object",
             "additionalProperties": False,
-            "required": ["steps", "memory", "verbose"],
+            "required": [
+                "steps",
+                "memory",
+                "verbose",
+                "dtype",
+                "timing_callback",
+                "column_pushdown",
+            ],
             "relevantToOptimizer": [],
             "properties": {
                 "steps": {
@@ -66,6 +132,40 @@ transformers is advantageous when fitting is time consuming.""",
                     "type": "boolean",
                     "default": False,
                 },
+                "dtype": {
+                    "description": """Floating point type passed on to every step that has a dtype
+hyperparameter (the row-mean-center and window transformers), so the windows
+reaching the regressor are computed and stored in that precision.""",
+                    "anyOf": [
+                        {"enum": ["float32", "float64"]},
+                        {"enum": [None], "description": "Leave the steps unchanged."},
+                    ],
+                    "default": None,
+                },
+                "timing_callback": {
+                    "description": """If given, the steps are timed, and this is called after every fit
+and predict with the timings also stored in last_timings_: a dict with the total
+seconds, the seconds spent outside the steps converting data, the seconds lale
+spent validating and converting step inputs, and per step its name, method,
+seconds, and seconds inside the operator implementation (None for steps that
+are not lale_autoai operators).""",
+                    "anyOf": [
+                        {"laleType": "callable"},
+                        {
+                            "enum": [None],
+                            "description": "Do not time the steps; last_timings_ stays None.",
+                        },
+                    ],
+                    "default": None,
+                },
+                "column_pushdown": {
+                    "description": """If the first step names all the columns it reads through its
+feature_columns, target_columns, look_ahead_fcolumns and time_column
+hyperparameters, select those columns of X once at the pipeline entry and
+remap the indices of the step, so the other columns are never copied.""",
+                    "type": "boolean",
+                    "default": True,
+                },
             },
         }
     ]
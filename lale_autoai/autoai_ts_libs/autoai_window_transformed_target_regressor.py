@@ -15,12 +15,28 @@
 from autoai_ts_libs.sklearn.mvp_windowed_transformed_target_estimators import (  # type: ignore # noqa
     AutoaiWindowTransformedTargetRegressor as model_to_be_wrapped,
 )
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
 from sklearn.pipeline import Pipeline, make_pipeline
 
 import lale.docstrings
 import lale.operators
 
 
+def _fit_horizon(regressor, X, y):
+    return regressor.fit(X, y)
+
+
+def _shifted_target(T, step):
+    """Target step time points ahead; the last rows, which have no such
+    target, are filled with the column means as autoai_ts_libs does."""
+    y = np.empty_like(T, dtype=float)
+    y[:-step] = T[step:]
+    y[-step:] = T[step:].mean(axis=0)
+    return y
+
+
 class _AutoaiWindowTransformedTargetRegressorImpl:
     def __init__(
         self,
@@ -38,6 +54,8 @@ class _AutoaiWindowTransformedTargetRegressorImpl:
         estimator_prediction_type="forecast",
         time_column=-1,
         random_state=42,
+        multistep_prediction_strategy="recursive",
+        n_jobs=None,
     ):
         if regressor is None:
             nested_op = None
@@ -67,13 +85,84 @@ class _AutoaiWindowTransformedTargetRegressorImpl:
             "random_state": random_state,
         }
         self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
+        self._strategy = multistep_prediction_strategy
+        self._n_jobs = n_jobs
+
+    def _direct(self):
+        if self._strategy != "direct":
+            return False
+        hp = self._hyperparams
+        if hp["one_shot"] or hp["row_mean_center"] or hp["scaling_func"] is not None:
+            raise ValueError(
+                "multistep_prediction_strategy='direct' does not support one_shot, "
+                "row_mean_center or scaling_func."
+            )
+        if hp["regressor"] is None:
+            raise ValueError(
+                "multistep_prediction_strategy='direct' requires a regressor."
+            )
+        return hp["prediction_horizon"] > 1
+
+    def _columns(self, X, columns):
+        return list(range(X.shape[1])) if columns is None else columns
 
     def fit(self, X, y):
-        self._wrapped_model.fit(X, y)
+        if not self._direct():
+            self._wrapped_model.fit(X, y)
+            self._horizon_regressors = None
+            return self
+        X = np.asarray(X)
+        X_features = X[:, self._columns(X, self._hyperparams["feature_columns"])]
+        T = X[:, self._columns(X, self._hyperparams["target_columns"])]
+        regressor = self._hyperparams["regressor"]
+        fitted = Parallel(n_jobs=self._n_jobs)(
+            [delayed(self._wrapped_model.fit)(X, y)]
+            + [
+                delayed(_fit_horizon)(
+                    clone(regressor), X_features, _shifted_target(T, step)
+                )
+                for step in range(2, self._hyperparams["prediction_horizon"] + 1)
+            ]
+        )
+        self._wrapped_model = fitted[0]
+        self._horizon_regressors = [self._wrapped_model.regressor_] + fitted[1:]
+        self._history = X[-self._hyperparams["lookback_window"] :]
         return self
 
+    def _predict_direct(self, X):
+        X_features = X[:, self._columns(X, self._hyperparams["feature_columns"])]
+        predictions = [
+            np.asarray(r.predict(X_features)).reshape(len(X), -1)
+            for r in self._horizon_regressors
+        ]
+        return np.stack(predictions, axis=1)
+
+    def _predict_rowwise_direct(self, X):
+        X = np.concatenate([self._history, np.asarray(X)])
+        return self._predict_direct(X)[len(self._history) :]
+
     def predict(self, X=None, prediction_type=None, **predict_params):
-        return self._wrapped_model.predict(X, prediction_type, **predict_params)
+        if self._horizon_regressors is None:
+            return self._wrapped_model.predict(X, prediction_type, **predict_params)
+        if prediction_type is None:
+            prediction_type = self._hyperparams["estimator_prediction_type"]
+        if X is None:
+            if prediction_type == "rowwise":
+                raise ValueError("Rowwise predictions require X.")
+            return self._predict_direct(self._history)[-1]
+        rowwise = self._predict_rowwise_direct(X)
+        return rowwise if prediction_type == "rowwise" else rowwise[-1]
+
+    def predict_all(self, X):
+        """Predictions of every horizon for every prediction_type, computed
+        with a single pass of the preprocessing and the regressors over X.
+
+        Returns a dict from prediction_type to predictions."""
+        if self._horizon_regressors is None:
+            rowwise = self._wrapped_model.predict(X, "rowwise")
+        else:
+            rowwise = self._predict_rowwise_direct(X)
+        return {"forecast": rowwise[-1], "rowwise": rowwise}
 
 
 _hyperparams_schema = {
@@ -97,6 +186,8 @@ _hyperparams_schema = {
                 "estimator_prediction_type",
                 "time_column",
                 "random_state",
+                "multistep_prediction_strategy",
+                "n_jobs",
             ],
             "relevantToOptimizer": ["lookback_window"],
             "properties": {
@@ -179,6 +270,37 @@ The inverse function is used to return predictions to the same space of the orig
                     "laleType": "Any",
                     "default": 42,
                 },
+                "multistep_prediction_strategy": {
+                    "description": """How steps after the first of the prediction horizon are
+predicted. The first step is the same regressor either way.""",
+                    "anyOf": [
+                        {
+                            "description": "Feed back one-step predictions, as autoai_ts_libs does.",
+                            "enum": ["recursive"],
+                        },
+                        {
+                            "description": """Predict step h with its own clone of regressor trained on
+targets h time points ahead; requires a regressor and no one_shot, row_mean_center
+or scaling_func, and costs about one fit per step.""",
+                            "enum": ["direct"],
+                        },
+                    ],
+                    "default": "recursive",
+                },
+                "n_jobs": {
+                    "description": """Number of CPU cores for fitting the regressors of the steps
+concurrently with multistep_prediction_strategy="direct"; does not change the model.""",
+                    "anyOf": [
+                        {"description": "One core.", "enum": [None]},
+                        {"description": "Use all processors.", "enum": [-1]},
+                        {
+                            "description": "Number of CPU cores.",
+                            "type": "integer",
+                            "minimum": 1,
+                        },
+                    ],
+                    "default": None,
+                },
             },
         }
     ]
@@ -242,6 +364,15 @@ _combined_schemas = {
     "import_from": "autoai_ts_libs.sklearn.mvp_windowed_transformed_target_estimators",
     "type": "object",
     "tags": {"pre": [], "op": ["estimator", "regressor"], "post": []},
+    "cost_model": {
+        "description": """Fit cost, see lale_autoai.cost: a regression on n_rows windows of
+lookback_window * n_columns features, quadratic in the window width as for a least
+squares fit; analytic, not measured.""",
+        "form": "windowed_regression",
+        "intercept_seconds": 0.01,
+        "seconds_per_unit": 1e-9,
+        "bytes_per_cell": 8,
+    },
     "properties": {
         "hyperparams": _hyperparams_schema,
         "input_fit": _input_fit_schema,
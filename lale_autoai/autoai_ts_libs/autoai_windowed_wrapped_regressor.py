@@ -15,14 +15,67 @@
 from autoai_ts_libs.sklearn.mvp_windowed_wrapped_regressor import (  # type: ignore # noqa
     AutoaiWindowedWrappedRegressor as model_to_be_wrapped,
 )
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.multioutput import MultiOutputRegressor
 from sklearn.pipeline import make_pipeline
 
 import lale.docstrings
 import lale.operators
 
+from ._shared_memory import scratch_folder, share
+
+
+def _fit_estimator(estimator, X, y, target, **fit_params):
+    return estimator.fit(X, y[:, target], **fit_params)
+
+
+class _SharedMultiOutputRegressor(MultiOutputRegressor):
+    """MultiOutputRegressor that hands X and y to the per-target fits without
+    serializing them once per target.
+
+    With backend="shared_memory", X and y are written once to memory-mapped
+    files (in /dev/shm where it has room, else in the temp dir) that worker
+    processes map read-only; joblib passes memmaps by file name and each
+    worker picks its target column, which is contiguous since y is stored
+    column-major. With backend="threading", the per-target fits run in
+    threads on X itself, which only pays off for regressors that release
+    the GIL."""
+
+    def __init__(self, estimator, *, n_jobs=None, backend="shared_memory"):
+        super().__init__(estimator, n_jobs=n_jobs)
+        self.backend = backend
+
+    def fit(self, X, y, sample_weight=None, **fit_params):
+        y = np.asarray(y)
+        if y.ndim == 1:
+            raise ValueError(
+                "y must have at least two dimensions for multi-output regression."
+            )
+        if sample_weight is not None:
+            fit_params["sample_weight"] = sample_weight
+        X = np.asarray(X)
+        if self.backend == "threading":
+            self.estimators_ = self._fit_all(X, y, "threads", fit_params)
+        else:
+            with scratch_folder(X.nbytes + y.nbytes) as folder:
+                X = share(folder, "X", X)
+                y = share(folder, "y", y, fortran_order=True)
+                self.estimators_ = self._fit_all(X, y, "processes", fit_params)
+        if hasattr(self.estimators_[0], "n_features_in_"):
+            self.n_features_in_ = self.estimators_[0].n_features_in_
+        return self
+
+    def _fit_all(self, X, y, prefer, fit_params):
+        return Parallel(n_jobs=self.n_jobs, prefer=prefer)(
+            delayed(_fit_estimator)(clone(self.estimator), X, y, i, **fit_params)
+            for i in range(y.shape[1])
+        )
+
 
 class _AutoaiWindowedWrappedRegressorImpl:
-    def __init__(self, regressor=None, n_jobs=None):
+    def __init__(self, regressor=None, n_jobs=None, parallel_backend=None):
         if regressor is None:
             nested_op = None
         elif isinstance(regressor, lale.operators.TrainableIndividualOp):
@@ -34,9 +87,17 @@ class _AutoaiWindowedWrappedRegressorImpl:
             nested_op = None
         self._hyperparams = {"regressor": nested_op, "n_jobs": n_jobs}
         self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
+        self._parallel_backend = parallel_backend
 
     def fit(self, X, y):
-        self._wrapped_model.fit(X, y)
+        if self._parallel_backend is None or np.ndim(y) == 1 or np.shape(y)[1] == 1:
+            self._wrapped_model.fit(X, y)
+            return self
+        self._wrapped_model.regressor_ = _SharedMultiOutputRegressor(
+            self._hyperparams["regressor"],
+            n_jobs=self._hyperparams["n_jobs"],
+            backend=self._parallel_backend,
+        ).fit(X, y)
         return self
 
     def predict(self, X, **predict_params):
@@ -49,7 +110,7 @@ _hyperparams_schema = {
             "description": "This first object lists all constructor arguments with their types, but omits constraints for conditional hyperparameters.",
             "type": "object",
             "additionalProperties": False,
-            "required": ["regressor", "n_jobs"],
+            "required": ["regressor", "n_jobs", "parallel_backend"],
             "relevantToOptimizer": [],
             "properties": {
                 "regressor": {
@@ -74,6 +135,24 @@ For a multi-variate case, this is wrapped in sklearn.multioutput.MultiOutputRegr
                     ],
                     "default": None,
                 },
+                "parallel_backend": {
+                    "description": "How the per-target regressors of a multivariate time series get the data when fitting in parallel.",
+                    "anyOf": [
+                        {
+                            "description": "sklearn.multioutput.MultiOutputRegressor, which serializes X to every worker for every target.",
+                            "enum": [None],
+                        },
+                        {
+                            "description": "Write X once to a read-only shared memory map that all worker processes use.",
+                            "enum": ["shared_memory"],
+                        },
+                        {
+                            "description": "Fit in threads on X itself; for regressors that release the GIL.",
+                            "enum": ["threading"],
+                        },
+                    ],
+                    "default": None,
+                },
             },
         }
     ]
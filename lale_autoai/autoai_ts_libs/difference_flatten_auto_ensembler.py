@@ -16,9 +16,16 @@ from autoai_ts_libs.srom.estimators.time_series.models.srom_estimators import (
     DifferenceFlattenAutoEnsembler as model_to_be_wrapped,
 )
 
+import numpy as np
+
 import lale.docstrings
 import lale.operators
 
+from ..batching import batcher_for
+from ._common_schemas import schema_fidelity
+from ._compaction import compact
+from ._fidelity import most_recent, window_rows
+
 
 class _DifferenceFlattenAutoEnsemblerImpl:
     def __init__(
@@ -45,7 +52,10 @@ class _DifferenceFlattenAutoEnsemblerImpl:
         n_jobs=-1,
         look_ahead_fcolumns=[],
         estimator=None,
+        fidelity=1.0,
     ):
+        self._fidelity = fidelity
+        self._min_rows = window_rows(lookback_win, pred_win)
         self._hyperparams = {
             "feature_columns": feature_columns,
             "target_columns": target_columns,
@@ -71,14 +81,70 @@ class _DifferenceFlattenAutoEnsemblerImpl:
             "estimator": estimator,
         }
         self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
+        self._levels = None
+
+    def _streamable(self):
+        hp = self._hyperparams
+        return (
+            list(hp["feature_columns"]) == list(hp["target_columns"])
+            and not hp["look_ahead_fcolumns"]
+            and hp["data_transformation_scheme"] is None
+            and hp["multistep_prediction_strategy"] is None
+        )
+
+    def _target_rows(self, X):
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(-1, 1)
+        return X[:, self._hyperparams["target_columns"]]
 
     def fit(self, X, y):
+        X, y = most_recent(self._fidelity, X, y, self._min_rows)
         self._wrapped_model.fit(X, y)
+        self._levels = None
+        if self._streamable():
+            L = self._hyperparams["lookback_win"]
+            self._levels = self._target_rows(X)[-L:].copy()
         return self
 
+    def update(self, X_new):
+        """Advance the differencing state by the rows of X_new, keeping only
+        the last lookback_win levels, so that predict() without X forecasts
+        from the end of X_new without the full history."""
+        if self._levels is None:
+            raise ValueError(
+                "update requires a fitted model with feature_columns equal to target_columns, no look_ahead_fcolumns, data_transformation_scheme and multistep_prediction_strategy."
+            )
+        L = self._hyperparams["lookback_win"]
+        X_new = self._target_rows(X_new)[-L:]
+        self._levels = np.concatenate([self._levels[len(X_new) :], X_new])
+        return self
+
+    def compact(self, measure=False):
+        """Drop what only the model search needed once fit is done: the
+        pipelines explored besides the n_leaders_for_ensemble leaders, their
+        scores and search paths, and, with store_lookback_history, all but
+        the last window of the training series. If measure, returns the
+        bytes freed, as measured by pickling the model before and after;
+        else None."""
+        return compact(self._wrapped_model, self._min_rows, measure)
+
+    def _predict_levels(self):
+        # DifferenceFlatten windows hold the differences of the last levels and
+        # its targets are offsets from the last level of their window.
+        windows = np.diff(self._levels, axis=0).T
+        regressor = self._wrapped_model.steps[-1][1]
+        offsets = regressor.predict(windows).reshape(len(windows), -1)
+        return (offsets + self._levels[-1][:, np.newaxis]).T
+
     def predict(self, X=None, **predict_params):
+        if X is None and not predict_params and self._levels is not None:
+            return self._predict_levels()
         return self._wrapped_model.predict(X, **predict_params)
 
+    async def apredict(self, X=None, **predict_params):
+        return await batcher_for(self).submit(X, **predict_params)
+
     def predict_proba(self, X=None):
         return self._wrapped_model.predict_proba(X)
 
@@ -112,6 +178,7 @@ _hyperparams_schema = {
                 "n_jobs",
                 "look_ahead_fcolumns",
                 "estimator",
+                "fidelity",
             ],
             "relevantToOptimizer": [],
             "properties": {
@@ -260,6 +327,7 @@ _hyperparams_schema = {
                     "anyOf": [{"laleType": "Any"}, {"enum": [None]}],
                     "default": None,
                 },
+                "fidelity": schema_fidelity,
             },
         }
     ]
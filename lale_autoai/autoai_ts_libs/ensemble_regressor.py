@@ -16,17 +16,299 @@ from autoai_ts_libs.srom.estimators.regression.auto_ensemble_regressor import (
     EnsembleRegressor as model_to_be_wrapped,
 )
 
+import copy
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+
 import lale.docstrings
 import lale.operators
 
+
+_AGGREGATES = {"mean": np.mean, "median": np.median}
+
+
+def _voting_ensemble(model):
+    """The voting ensemble of a fitted backend EnsembleRegressor. It holds one
+    BaggingRegressor per leader in bagging_models and predicts the aggr_type
+    ("mean" or "median") of the predictions of all their estimators."""
+    search = getattr(model, "auto_regression", None)
+    return getattr(search, "voting_ensemble_estimator", None)
+
+
+def _greedy_prune(P, y, aggregate, tol):
+    """Repeatedly drop the member whose removal lowers the R^2 of the
+    aggregated prediction by less than tol. P holds, per member, one row of
+    predictions per estimator; returns the indices of the members kept."""
+
+    def r2(kept):
+        return r2_score(y, aggregate(np.concatenate([P[i] for i in kept]), axis=0))
+
+    kept = list(range(len(P)))
+    score = r2(kept)
+    while len(kept) > 1:
+        scores = [r2(kept[:i] + kept[i + 1 :]) for i in range(len(kept))]
+        best = int(np.argmax(scores))
+        if score - scores[best] >= tol:
+            break
+        score = scores[best]
+        del kept[best]
+    return kept
+
+
+def _rows(X, lo, hi):
+    return X.iloc[lo:hi] if hasattr(X, "iloc") else X[lo:hi]
+
+
+class _EnsembleRegressorImpl:
+    def __init__(
+        self,
+        level="default",
+        save_prefix="auto_regression_output_",
+        execution_platform="spark_node_random_search",
+        cv=5,
+        scoring=None,
+        stages=None,
+        execution_time_per_pipeline=2,
+        num_options_per_pipeline_for_random_search=10,
+        num_option_per_pipeline_for_intelligent_search=30,
+        total_execution_time=10,
+        param_grid=None,
+        n_estimators_for_pred_interval=30,
+        bootstrap_for_pred_interval=True,
+        prediction_percentile=95,
+        aggr_type_for_pred_interval="median",
+        n_leaders_for_ensemble=5,
+        max_samples_for_pred_interval=1.0,
+        ensemble_type="voting",
+        n_jobs=None,
+        pruning_tol=None,
+        pruning_validation_fraction=0.2,
+        **kwargs,
+    ):
+        self._hyperparams = {
+            "level": level,
+            "save_prefix": save_prefix,
+            "execution_platform": execution_platform,
+            "cv": cv,
+            "scoring": scoring,
+            "stages": stages,
+            "execution_time_per_pipeline": execution_time_per_pipeline,
+            "num_options_per_pipeline_for_random_search": num_options_per_pipeline_for_random_search,
+            "num_option_per_pipeline_for_intelligent_search": num_option_per_pipeline_for_intelligent_search,
+            "total_execution_time": total_execution_time,
+            "param_grid": param_grid,
+            "n_estimators_for_pred_interval": n_estimators_for_pred_interval,
+            "bootstrap_for_pred_interval": bootstrap_for_pred_interval,
+            "prediction_percentile": prediction_percentile,
+            "aggr_type_for_pred_interval": aggr_type_for_pred_interval,
+            "n_leaders_for_ensemble": n_leaders_for_ensemble,
+            "max_samples_for_pred_interval": max_samples_for_pred_interval,
+            "ensemble_type": ensemble_type,
+            **kwargs,
+        }
+        self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
+        self._n_jobs = n_jobs
+        self._pruning_tol = pruning_tol
+        self._pruning_validation_fraction = pruning_validation_fraction
+
+    def fit(self, X, y):
+        self._pruned = None
+        if self._pruning_tol is None:
+            self._wrapped_model.fit(X, y)
+            return self
+        n_fit = int(len(X) * (1 - self._pruning_validation_fraction))
+        self._wrapped_model.fit(_rows(X, 0, n_fit), _rows(y, 0, n_fit))
+        voting = _voting_ensemble(self._wrapped_model)
+        if voting is None:
+            raise ValueError("Pruning requires ensemble_type='voting'.")
+        X_val, y_val = _rows(X, n_fit, len(X)), np.asarray(_rows(y, n_fit, len(X)))
+        P = [np.stack(self._predict_estimators([m], X_val)) for m in voting.bagging_models]
+        kept = _greedy_prune(P, y_val, _AGGREGATES[voting.aggr_type], self._pruning_tol)
+        # a copy of the backend's voting ensemble with the kept members refit
+        # on all rows, so that its own predict and predict_interval aggregate
+        # them; the backend model is left as fitted
+        self._pruned = copy.copy(voting)
+        self._pruned.bagging_models = [
+            clone(voting.bagging_models[i]).fit(X, y) for i in kept
+        ]
+        return self
+
+    def _predict_estimators(self, members, X):
+        return Parallel(n_jobs=self._n_jobs, prefer="threads")(
+            delayed(e.predict)(X) for m in members for e in m.estimators_
+        )
+
+    def predict(self, X=None):
+        pruned = getattr(self, "_pruned", None)
+        voting = _voting_ensemble(self._wrapped_model) if pruned is None else pruned
+        aggregate = _AGGREGATES.get(getattr(voting, "aggr_type", None))
+        if self._n_jobs is None or X is None or aggregate is None:
+            return (self._wrapped_model if pruned is None else pruned).predict(X)
+        return aggregate(self._predict_estimators(voting.bagging_models, X), axis=0)
+
+    def predict_proba(self, X=None):
+        pruned = getattr(self, "_pruned", None)
+        if pruned is None:
+            return self._wrapped_model.predict_proba(X)
+        return pruned.predict_interval(X, self._hyperparams["prediction_percentile"])
+
+
 _hyperparams_schema = {
     "allOf": [
         {
             "description": "This first object lists all constructor arguments with their types, but omits constraints for conditional hyperparameters.",
             "type": "object",
             "additionalProperties": True,
+            "required": [
+                "level",
+                "execution_platform",
+                "cv",
+                "total_execution_time",
+                "n_leaders_for_ensemble",
+                "ensemble_type",
+                "n_jobs",
+                "pruning_tol",
+                "pruning_validation_fraction",
+            ],
             "relevantToOptimizer": [],
-            "properties": {},
+            "properties": {
+                "level": {
+                    "description": "Depth of the search over regression pipelines.",
+                    "type": "string",
+                    "default": "default",
+                },
+                "save_prefix": {
+                    "description": "Prefix of the files in which the search results are saved.",
+                    "type": "string",
+                    "default": "auto_regression_output_",
+                },
+                "execution_platform": {
+                    "description": "Platform for execution of srom pipeline.",
+                    "type": "string",
+                    "default": "spark_node_random_search",
+                },
+                "cv": {
+                    "description": "Number of cross-validation folds used to score the candidate pipelines.",
+                    "type": "integer",
+                    "minimum": 2,
+                    "default": 5,
+                },
+                "scoring": {
+                    "description": "Scoring used to rank the candidate pipelines.",
+                    "anyOf": [{"laleType": "Any"}, {"enum": [None]}],
+                    "default": None,
+                },
+                "stages": {
+                    "description": "Stages of the pipelines to search over.",
+                    "anyOf": [{"laleType": "Any"}, {"enum": [None]}],
+                    "default": None,
+                },
+                "execution_time_per_pipeline": {
+                    "description": "Maximum execution time per pipeline.",
+                    "type": "number",
+                    "default": 2,
+                },
+                "num_options_per_pipeline_for_random_search": {
+                    "description": "Number of hyperparameter settings tried per pipeline by random search.",
+                    "type": "integer",
+                    "minimum": 1,
+                    "default": 10,
+                },
+                "num_option_per_pipeline_for_intelligent_search": {
+                    "description": "Number of hyperparameter settings tried per pipeline by intelligent search.",
+                    "type": "integer",
+                    "minimum": 1,
+                    "default": 30,
+                },
+                "total_execution_time": {
+                    "description": "Approximate maximum runtime allowed.",
+                    "type": "number",
+                    "default": 10,
+                },
+                "param_grid": {
+                    "description": "Hyperparameter grid of the searched pipelines.",
+                    "anyOf": [{"laleType": "Any"}, {"enum": [None]}],
+                    "default": None,
+                },
+                "n_estimators_for_pred_interval": {
+                    "description": "Number of estimators to used to estimate prediction intervals.",
+                    "type": "integer",
+                    "default": 30,
+                },
+                "bootstrap_for_pred_interval": {
+                    "description": "Whether samples are drawn with replacement for the prediction interval estimators.",
+                    "type": "boolean",
+                    "default": True,
+                },
+                "prediction_percentile": {
+                    "description": "Percentile of the prediction interval.",
+                    "type": "number",
+                    "minimum": 0,
+                    "maximum": 100,
+                    "default": 95,
+                },
+                "aggr_type_for_pred_interval": {
+                    "description": "How the predictions of the prediction interval estimators are aggregated.",
+                    "type": "string",
+                    "default": "median",
+                },
+                "n_leaders_for_ensemble": {
+                    "description": "Number of models to use when creating the ensemble model.",
+                    "type": "integer",
+                    "minimum": 1,
+                    "default": 5,
+                },
+                "max_samples_for_pred_interval": {
+                    "description": "Maximum number of samples to use when generating prediction intervals.",
+                    "type": "number",
+                    "default": 1.0,
+                },
+                "ensemble_type": {
+                    "description": "Ensemble method used to combine predictors.",
+                    "type": "string",
+                    "default": "voting",
+                },
+                "n_jobs": {
+                    "description": """Number of threads predicting the estimators of the members of a
+voting ensemble concurrently; their predictions are aggregated as in autoai_ts_libs.""",
+                    "anyOf": [
+                        {
+                            "description": "Predict through autoai_ts_libs, one member after the other.",
+                            "enum": [None],
+                        },
+                        {"description": "Use all processors.", "enum": [-1]},
+                        {
+                            "description": "Number of CPU cores.",
+                            "type": "integer",
+                            "minimum": 1,
+                        },
+                    ],
+                    "default": None,
+                },
+                "pruning_tol": {
+                    "description": """After fitting on the leading rows, greedily drop members of
+the voting ensemble while dropping one lowers the R^2 of the ensemble prediction
+on the held-out trailing rows by less than this tolerance, then refit the kept
+members on all rows; predict and predict_proba then aggregate only those.""",
+                    "anyOf": [
+                        {"type": "number", "minimum": 0},
+                        {"description": "Keep all members.", "enum": [None]},
+                    ],
+                    "default": None,
+                },
+                "pruning_validation_fraction": {
+                    "description": "Fraction of trailing rows held out of the fit to validate pruning. Only used when pruning_tol is set.",
+                    "type": "number",
+                    "minimum": 0.0,
+                    "exclusiveMinimum": True,
+                    "maximum": 1.0,
+                    "exclusiveMaximum": True,
+                    "default": 0.2,
+                },
+            },
         }
     ]
 }
@@ -120,6 +402,8 @@ _combined_schemas = {
     },
 }
 
-EnsembleRegressor = lale.operators.make_operator(model_to_be_wrapped, _combined_schemas)
+EnsembleRegressor = lale.operators.make_operator(
+    _EnsembleRegressorImpl, _combined_schemas
+)
 
 lale.docstrings.set_docstrings(EnsembleRegressor)
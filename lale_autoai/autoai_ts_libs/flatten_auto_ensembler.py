@@ -19,6 +19,11 @@ from autoai_ts_libs.srom.estimators.time_series.models.srom_estimators import (
 import lale.docstrings
 import lale.operators
 
+from ..batching import batcher_for
+from ._common_schemas import schema_fidelity
+from ._compaction import compact
+from ._fidelity import most_recent, window_rows
+
 
 class _FlattenAutoEnsemblerImpl:
     def __init__(
@@ -44,7 +49,10 @@ class _FlattenAutoEnsemblerImpl:
         n_jobs=-1,
         look_ahead_fcolumns=[],
         estimator=None,
+        fidelity=1.0,
     ):
+        self._fidelity = fidelity
+        self._min_rows = window_rows(lookback_win, pred_win)
         self._hyperparams = {
             "feature_columns": feature_columns,
             "target_columns": target_columns,
@@ -71,12 +79,25 @@ class _FlattenAutoEnsemblerImpl:
         self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
 
     def fit(self, X, y):
+        X, y = most_recent(self._fidelity, X, y, self._min_rows)
         self._wrapped_model.fit(X, y)
         return self
 
+    def compact(self, measure=False):
+        """Drop what only the model search needed once fit is done: the
+        pipelines explored besides the n_leaders_for_ensemble leaders, their
+        scores and search paths, and, with store_lookback_history, all but
+        the last window of the training series. If measure, returns the
+        bytes freed, as measured by pickling the model before and after;
+        else None."""
+        return compact(self._wrapped_model, self._min_rows, measure)
+
     def predict(self, X=None, **predict_params):
         return self._wrapped_model.predict(X, **predict_params)
 
+    async def apredict(self, X=None, **predict_params):
+        return await batcher_for(self).submit(X, **predict_params)
+
     def predict_proba(self, X=None):
         return self._wrapped_model.predict_proba(X)
 
@@ -109,6 +130,7 @@ _hyperparams_schema = {
                 "n_jobs",
                 "look_ahead_fcolumns",
                 "estimator",
+                "fidelity",
             ],
             "relevantToOptimizer": ["lookback_win", "data_transformation_scheme"],
             "properties": {
@@ -252,6 +274,7 @@ _hyperparams_schema = {
                     "anyOf": [{"laleType": "Any"}, {"enum": [None]}],
                     "default": None,
                 },
+                "fidelity": schema_fidelity,
             },
         }
     ]
@@ -336,6 +359,15 @@ _combined_schemas = {
     "import_from": "autoai_ts_libs.srom.estimators.time_series.models.srom_estimators",
     "type": "object",
     "tags": {"pre": [], "op": ["estimator", "forecaster"], "post": []},
+    "cost_model": {
+        "description": """Fit cost, see lale_autoai.cost: n_leaders_for_ensemble models on the
+n_rows * lookback_win * len(feature_columns) flattened windows; "auto" tries several transformations. Analytic, not measured.""",
+        "form": "flatten_ensemble",
+        "intercept_seconds": 0.1,
+        "seconds_per_unit": 1e-7,
+        "bytes_per_cell": 8,
+        "factors": {"data_transformation_scheme": {"auto": 10.0}},
+    },
     "properties": {
         "hyperparams": _hyperparams_schema,
         "input_fit": _input_fit_schema,
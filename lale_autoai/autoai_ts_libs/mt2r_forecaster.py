@@ -16,9 +16,20 @@ from autoai_ts_libs.srom.estimators.time_series.models.MT2RForecaster import (
     MT2RForecaster as model_to_be_wrapped,
 )
 
+import numpy as np
+try:
+    from joblib import parallel_config
+except ImportError:  # joblib < 1.3
+    from joblib import parallel_backend as parallel_config
+
 import lale.docstrings
 import lale.operators
 
+from ..batching import batcher_for
+from ._common_schemas import cost_model_decomposition, schema_fidelity
+from ._fidelity import most_recent, window_rows
+from ._shared_memory import scratch_folder, share
+
 
 class _MT2RForecasterImpl:
     def __init__(
@@ -31,7 +42,11 @@ class _MT2RForecasterImpl:
         lookback_win="auto",
         prediction_win=12,
         n_jobs=-1,
+        parallel_backend=None,
+        fidelity=1.0,
     ):
+        self._fidelity = fidelity
+        self._min_rows = window_rows(lookback_win, prediction_win)
         self._hyperparams = {
             "time_column": time_column,
             "feature_columns": feature_columns,
@@ -43,13 +58,32 @@ class _MT2RForecasterImpl:
             "n_jobs": n_jobs,
         }
         self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
+        self._parallel_backend = parallel_backend
+
+    def _run(self, method, X, *args, **kwargs):
+        """Call method of the wrapped model with X, letting its per-target
+        joblib calls run on the configured backend."""
+        if self._parallel_backend is None or self._hyperparams["n_jobs"] == 1:
+            return method(X, *args, **kwargs)
+        if self._parallel_backend == "threading":
+            with parallel_config(backend="threading"):
+                return method(X, *args, **kwargs)
+        a = None if X is None else np.asarray(X)
+        if a is None or a.dtype.hasobject:
+            return method(X, *args, **kwargs)
+        with scratch_folder(a.nbytes) as folder, parallel_config(backend="loky"):
+            return method(share(folder, "X", a), *args, **kwargs)
 
     def fit(self, X, y):
-        self._wrapped_model.fit(X, y)
+        X, y = most_recent(self._fidelity, X, y, self._min_rows)
+        self._run(self._wrapped_model.fit, X, y)
         return self
 
     def predict(self, X=None, **predict_params):
-        return self._wrapped_model.predict(X, **predict_params)
+        return self._run(self._wrapped_model.predict, X, **predict_params)
+
+    async def apredict(self, X=None, **predict_params):
+        return await batcher_for(self).submit(X, **predict_params)
 
     def predict_proba(self, X=None):
         return self._wrapped_model.predict_proba(X)
@@ -70,6 +104,8 @@ _hyperparams_schema = {
                 "lookback_win",
                 "prediction_win",
                 "n_jobs",
+                "parallel_backend",
+                "fidelity",
             ],
             "relevantToOptimizer": ["trend", "residual"],
             "properties": {
@@ -120,6 +156,26 @@ _hyperparams_schema = {
                     ],
                     "default": -1,
                 },
+                "parallel_backend": {
+                    "description": """How the per-target trend/residual models are fitted and predicted
+in parallel when n_jobs is not 1.""",
+                    "anyOf": [
+                        {
+                            "description": "Worker processes map X read-only from a memory-mapped file (in /dev/shm where it has room, else in the temp dir) instead of receiving a serialized copy per target column. Falls back to the default for non-numeric X.",
+                            "enum": ["shared_memory"],
+                        },
+                        {
+                            "description": "Threads working on X itself.",
+                            "enum": ["threading"],
+                        },
+                        {
+                            "description": "The joblib backend chosen by autoai_ts_libs.",
+                            "enum": [None],
+                        },
+                    ],
+                    "default": None,
+                },
+                "fidelity": schema_fidelity,
             },
         }
     ]
@@ -204,6 +260,7 @@ _combined_schemas = {
     "import_from": "autoai_ts_libs.srom.estimators.time_series.models.MT2RForecaster",
     "type": "object",
     "tags": {"pre": [], "op": ["estimator", "forecaster"], "post": []},
+    "cost_model": cost_model_decomposition,
     "properties": {
         "hyperparams": _hyperparams_schema,
         "input_fit": _input_fit_schema,
@@ -21,6 +21,8 @@ from autoai_ts_libs.anomaly_detection.estimators.constants import RUNMODE_TEST
 import lale.docstrings
 import lale.operators
 
+from .. import watfore_session
+
 
 class _PointwiseBoundedAnomalyDetectorImpl:
     def __init__(
@@ -60,10 +62,12 @@ class _PointwiseBoundedAnomalyDetectorImpl:
         )
 
     def fit(self, X, y=None, _reset_model=True, **fit_params):
+        watfore_session.session()
         self._wrapped_model.fit(X, y, _reset_model, **fit_params)
         return self
 
     def predict(self, X=None):
+        watfore_session.session()
         return self._wrapped_model.predict(X)
 
 
@@ -292,3 +296,5 @@ PointwiseBoundedAnomalyDetector = lale.operators.make_operator(
     _PointwiseBoundedAnomalyDetectorImpl, _combined_schemas
 )
 lale.docstrings.set_docstrings(PointwiseBoundedAnomalyDetector)
+
+watfore_session.prewarm_in_background()
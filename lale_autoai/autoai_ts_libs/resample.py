@@ -0,0 +1,322 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pandas as pd
+
+import lale.docstrings
+import lale.operators
+
+_AGGREGATIONS = ("mean", "sum", "min", "max", "first", "last")
+
+
+def _timestamps(X, loc):
+    """The timestamp column as int64 nanoseconds or float64, and its
+    datetime dtype if it had one."""
+    t = X.iloc[:, loc] if isinstance(X, pd.DataFrame) else np.asarray(X)[:, loc]
+    if pd.api.types.is_datetime64_any_dtype(t):
+        t = pd.Series(pd.to_datetime(t))
+        dtype = t.dtype
+        if hasattr(t.dt, "as_unit"):  # pandas 2 keeps the unit, e.g. seconds
+            t = t.dt.as_unit("ns")
+        return np.asarray(t.astype("int64")), dtype
+    return np.asarray(t, dtype=float), None
+
+
+def _datetimes(edges, dtype):
+    """The int64 nanosecond edges as datetimes of dtype, or of nanoseconds
+    if that unit cannot represent them."""
+    tz = getattr(dtype, "tz", None)
+    t = pd.to_datetime(edges.astype(np.int64), utc=tz is not None)
+    t = t if tz is None else t.tz_convert(tz)
+    unit = np.datetime_data(np.dtype(getattr(dtype, "base", dtype)))[0]
+    if unit != "ns" and hasattr(t, "as_unit"):
+        if not (edges % pd.Timedelta(1, unit=unit).value).any():
+            t = t.as_unit(unit)
+    return t
+
+
+def _values(X, loc):
+    if isinstance(X, pd.DataFrame):
+        return X.drop(columns=X.columns[loc]).to_numpy(dtype=float)
+    return np.delete(np.asarray(X, dtype=float), loc, axis=1)
+
+
+def _aggregate(bins, V, n_bins, aggregation):
+    """Aggregate the rows of V, sorted by their bin in bins, per bin;
+    missing values (NaN) are ignored and empty bins are NaN."""
+    result = np.full((n_bins, V.shape[1]), np.nan)
+    grid = np.arange(n_bins)
+    starts = np.searchsorted(bins, grid, side="left")
+    ends = np.searchsorted(bins, grid, side="right")
+    filled = ends > starts
+    if not filled.any():
+        return result
+    starts, ends = starts[filled], ends[filled]
+    if aggregation in ("mean", "sum"):
+        present = ~np.isnan(V)
+        sums = np.add.reduceat(np.where(present, V, 0.0), starts, axis=0)
+        counts = np.add.reduceat(present, starts, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if aggregation == "mean":
+                values = sums / counts
+            else:
+                values = np.where(counts > 0, sums, np.nan)
+    elif aggregation == "min":
+        values = np.fmin.reduceat(V, starts, axis=0)
+    elif aggregation == "max":
+        values = np.fmax.reduceat(V, starts, axis=0)
+    elif aggregation == "first":
+        values = V[starts]
+    else:
+        values = V[ends - 1]
+    result[filled] = values
+    return result
+
+
+class _ResampleImpl:
+    # DataFrames keep their column names and datetimes in the output
+    _accepts_pandas = True
+
+    def __init__(self, ts_icol_loc=[0], ts_ocol_loc=-1, freq=None, aggregation="mean"):
+        self._hyperparams = {
+            "ts_icol_loc": ts_icol_loc,
+            "ts_ocol_loc": ts_ocol_loc,
+            "freq": freq,
+            "aggregation": aggregation,
+        }
+
+    def _loc(self):
+        ts_icol_loc = self._hyperparams["ts_icol_loc"]
+        return None if ts_icol_loc == -1 else ts_icol_loc[0]
+
+    def fit(self, X, y=None):
+        loc = self._loc()
+        if loc is None:
+            return self
+        t, self._datetime_dtype = _timestamps(X, loc)
+        # datetimes stay int64 nanoseconds: as float64 they lose precision
+        exact = int if self._datetime_dtype is not None else float
+        freq = self._hyperparams["freq"]
+        if freq is None:
+            steps = np.diff(np.sort(t))
+            steps = steps[steps > 0]
+            if len(steps) == 0:
+                raise ValueError("Cannot infer freq from fewer than two timestamps.")
+            self._step = exact(np.median(steps))
+        elif isinstance(freq, str):
+            self._step = exact(pd.Timedelta(freq).value)
+        else:
+            self._step = exact(freq)
+        if self._step <= 0:
+            raise ValueError("The freq of datetimes must be at least 1 nanosecond.")
+        self._origin = exact(np.min(t))
+        return self
+
+    def _edges(self, first_bin, n_bins):
+        return self._origin + self._step * np.arange(first_bin, first_bin + n_bins)
+
+    def _bin_of(self, t):
+        """The bins of t, exactly as the searchsorted over the edges in
+        _resample assigns them despite rounding in the division."""
+        t = np.asarray(t)
+        if self._datetime_dtype is not None:
+            return (t - self._origin) // self._step
+        k = np.floor((t - self._origin) / self._step)
+        k += t >= self._origin + self._step * (k + 1)
+        k -= t < self._origin + self._step * k
+        return k.astype(np.int64)
+
+    def _output(self, X, edges, values):
+        loc = self._hyperparams["ts_ocol_loc"]
+        if isinstance(X, pd.DataFrame):
+            columns = X.columns.delete(self._loc())
+            result = pd.DataFrame(values, columns=columns)
+            if loc >= 0:
+                t = edges
+                if self._datetime_dtype is not None:
+                    t = _datetimes(edges, self._datetime_dtype)
+                result.insert(min(loc, len(columns)), X.columns[self._loc()], t)
+            return result
+        if loc < 0:
+            return values
+        return np.insert(values, min(loc, values.shape[1]), edges, axis=1)
+
+    def _resample(self, t, V, first_bin, last_bin):
+        n_bins = last_bin - first_bin + 1
+        order = np.argsort(t, kind="stable")
+        t, V = t[order], V[order]
+        edges = self._edges(first_bin, n_bins)
+        bins = np.searchsorted(edges, t, side="right") - 1
+        return edges, _aggregate(bins, V, n_bins, self._hyperparams["aggregation"])
+
+    def transform(self, X):
+        loc = self._loc()
+        if loc is None:
+            return X
+        t, _ = _timestamps(X, loc)
+        V = _values(X, loc)
+        if len(t) == 0:
+            return self._output(X, np.empty(0), V)
+        edges, values = self._resample(
+            t, V, int(self._bin_of(np.min(t))), int(self._bin_of(np.max(t)))
+        )
+        return self._output(X, edges, values)
+
+    def transform_stream(self, chunks):
+        """Resample an iterable of consecutive chunks of X, yielding the
+        grid rows of each bin as soon as a later timestamp closes it. Rows
+        may be unordered within a chunk but must not fall into a bin already
+        yielded."""
+        loc = self._loc()
+        carry_t, carry_V, next_bin, X = None, None, None, None
+        for X in chunks:
+            if loc is None:
+                yield X
+                continue
+            t, _ = _timestamps(X, loc)
+            V = _values(X, loc)
+            if carry_t is not None:
+                t, V = np.concatenate([carry_t, t]), np.concatenate([carry_V, V])
+            if len(t) == 0:
+                continue
+            bins = self._bin_of(t)
+            first_bin, open_bin = int(bins.min()), int(bins.max())
+            if next_bin is not None and first_bin < next_bin:
+                raise ValueError("Timestamps fall into a bin already resampled.")
+            if next_bin is None:
+                next_bin = first_bin
+            closed = bins < open_bin
+            carry_t, carry_V = t[~closed], V[~closed]
+            if open_bin > next_bin:
+                edges, values = self._resample(
+                    t[closed], V[closed], next_bin, open_bin - 1
+                )
+                yield self._output(X, edges, values)
+                next_bin = open_bin
+        if carry_t is not None and len(carry_t) > 0:
+            edges, values = self._resample(carry_t, carry_V, next_bin, next_bin)
+            yield self._output(X, edges, values)
+
+
+_hyperparams_schema = {
+    "allOf": [
+        {
+            "description": "This first object lists all constructor arguments with their types, but omits constraints for conditional hyperparameters.",
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["ts_icol_loc", "ts_ocol_loc", "freq", "aggregation"],
+            "relevantToOptimizer": [],
+            "properties": {
+                "ts_icol_loc": {
+                    "description": """Location of the timestamp column in an array, e.g., [0] if the 0th column
+holds the timestamps, as for the imputers. Timestamps are numbers or, in a DataFrame, datetimes, and need not
+be ordered or equally spaced. If ts_icol_loc = -1, the data is taken to be ordered and equally sampled already
+and is passed through unchanged.""",
+                    "anyOf": [
+                        {"type": "array", "items": {"type": "integer", "minimum": 0}},
+                        {"enum": [-1]},
+                    ],
+                    "default": [0],
+                },
+                "ts_ocol_loc": {
+                    "description": """Location of the grid timestamps (the left edges of the bins) in the output.
+If -1, the timestamps are dropped, so the output can be fed to the imputers with ts_icol_loc = -1, which expect
+ordered, equally sampled data; values beyond the last column append the timestamps.""",
+                    "type": "integer",
+                    "default": -1,
+                },
+                "freq": {
+                    "description": "Spacing of the regular grid.",
+                    "anyOf": [
+                        {
+                            "type": "number",
+                            "exclusiveMinimum": True,
+                            "minimum": 0,
+                            "description": "In the units of the timestamps, nanoseconds for datetimes.",
+                        },
+                        {
+                            "type": "string",
+                            "description": "A pandas Timedelta string such as '5min', for datetime timestamps.",
+                        },
+                        {
+                            "enum": [None],
+                            "description": "The median spacing of the timestamps seen by fit.",
+                        },
+                    ],
+                    "default": None,
+                },
+                "aggregation": {
+                    "description": """How the rows that fall into one bin of the grid are combined; missing
+values (NaN) are ignored by mean, sum, min and max. Bins without rows are NaN, to be filled by a following imputer.""",
+                    "enum": list(_AGGREGATIONS),
+                    "default": "mean",
+                },
+            },
+        }
+    ]
+}
+
+_input_fit_schema = {
+    "type": "object",
+    "required": ["X"],
+    "additionalProperties": False,
+    "properties": {
+        "X": {
+            "type": "array",
+            "items": {"type": "array", "items": {"laleType": "Any"}},
+        },
+        "y": {"laleType": "Any"},
+    },
+}
+
+_input_transform_schema = {
+    "type": "object",
+    "required": ["X"],
+    "additionalProperties": False,
+    "properties": {
+        "X": {
+            "type": "array",
+            "items": {"type": "array", "items": {"laleType": "Any"}},
+        },
+    },
+}
+
+_output_transform_schema = {
+    "description": "Features; the outer array is over the bins of the grid.",
+    "type": "array",
+    "items": {"type": "array", "items": {"laleType": "Any"}},
+}
+
+_combined_schemas = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "description": """Resamples irregularly timestamped rows onto a regular grid.
+
+Each row is assigned to the bin of a regular grid, anchored at the first timestamp seen by fit, with a
+vectorized searchsorted over the bin edges, and the rows of each bin are aggregated with numpy reductions.
+transform_stream on the trained operator's implementation resamples consecutive chunks of a stream,
+keeping only the rows of the still open bin between chunks.""",
+    "type": "object",
+    "tags": {"pre": [], "op": ["transformer"], "post": []},
+    "properties": {
+        "hyperparams": _hyperparams_schema,
+        "input_fit": _input_fit_schema,
+        "input_transform": _input_transform_schema,
+        "output_transform": _output_transform_schema,
+    },
+}
+
+Resample = lale.operators.make_operator(_ResampleImpl, _combined_schemas)
+
+lale.docstrings.set_docstrings(Resample)
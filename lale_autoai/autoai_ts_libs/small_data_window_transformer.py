@@ -16,24 +16,130 @@ from autoai_ts_libs.sklearn.small_data_window_transformers import (  # type: ign
     SmallDataWindowTransformer as model_to_be_wrapped,
 )
 
+from collections import OrderedDict
+
+import numpy as np
+
 import lale.docstrings
 import lale.operators
 
+from ._common_schemas import cost_model_windows
+
+
+class _LastWindowCache:
+    """Trailing rows of many series in one contiguous arena.
+
+    Slot i of the arena holds the last lookback_window rows of one series,
+    right-aligned, with _lengths[i] of them valid. The arena doubles as
+    series arrive, up to capacity slots; when all of those are taken the
+    least recently used series is evicted."""
+
+    def __init__(self, capacity, lookback_window, n_features):
+        self._capacity = capacity
+        self._arena = np.full((0, lookback_window, n_features), np.nan)
+        self._lengths = np.zeros(0, dtype=int)
+        self._slots = OrderedDict()
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def _grow(self):
+        n_slots = min(self._capacity, max(1, 2 * len(self._arena)))
+        arena = np.full((n_slots,) + self._arena.shape[1:], np.nan)
+        arena[: len(self._arena)] = self._arena
+        self._arena = arena
+        self._lengths = np.resize(self._lengths, n_slots)
+
+    def get(self, key):
+        slot = self._slots.get(key)
+        if slot is None:
+            return np.empty((0, self._arena.shape[2]))
+        self._slots.move_to_end(key)
+        return self._arena[slot, self._arena.shape[1] - self._lengths[slot] :]
+
+    def put(self, key, rows):
+        rows = rows[-self._arena.shape[1] :]
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            if len(self._slots) < self._capacity:
+                slot = len(self._slots)
+                if slot == len(self._arena):
+                    self._grow()
+            else:
+                _, slot = self._slots.popitem(last=False)
+        self._slots[key] = slot
+        self._arena[slot, : self._arena.shape[1] - len(rows)] = np.nan
+        self._arena[slot, self._arena.shape[1] - len(rows) :] = rows
+        self._lengths[slot] = len(rows)
+
 
 class _SmallDataWindowTransformerImpl:
-    def __init__(self, lookback_window=None, cache_last_window_trainset=False):
+    def __init__(
+        self,
+        lookback_window=None,
+        cache_last_window_trainset=False,
+        series_id_column=None,
+        cache_size=10000,
+    ):
         self._hyperparams = {
             "lookback_window": lookback_window,
             "cache_last_window_trainset": cache_last_window_trainset,
         }
         self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
+        self._series_id_column = series_id_column
+        self._cache_size = cache_size
+
+    def _split_series(self, X):
+        X = np.asarray(X)
+        ids = X[:, self._series_id_column]
+        features = np.delete(X, self._series_id_column, axis=1).astype(float)
+        keys, inverse = np.unique(ids, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(keys)))
+        return features, zip(keys, np.split(order, bounds[:-1]))
 
     def fit(self, X, y=None):
-        self._wrapped_model.fit(X, y)
+        if self._series_id_column is None:
+            self._wrapped_model.fit(X, y)
+            return self
+        self._cache = None
+        return self.partial_fit(X, y)
+
+    def partial_fit(self, X, y=None):
+        if self._series_id_column is None:
+            raise ValueError("partial_fit requires series_id_column to be set.")
+        if getattr(self, "_cache", None) is None:
+            self._cache = _LastWindowCache(
+                self._cache_size,
+                self._hyperparams["lookback_window"],
+                np.shape(X)[1] - 1,
+            )
+        if not self._hyperparams["cache_last_window_trainset"]:
+            return self
+        features, series = self._split_series(X)
+        for key, rows in series:
+            tail = self._cache.get(key)
+            self._cache.put(key, np.concatenate([tail, features[rows]]))
         return self
 
     def transform(self, X):
-        return self._wrapped_model.transform(X)
+        if self._series_id_column is None:
+            return self._wrapped_model.transform(X)
+        L = self._hyperparams["lookback_window"]
+        features, series = self._split_series(X)
+        n, k = features.shape
+        Xt = np.empty((n, L * k))
+        pad = np.full((L - 1, k), np.nan)
+        for key, rows in series:
+            tail = self._cache.get(key)
+            tail = tail[max(len(tail) - L + 1, 0) :]
+            history = np.concatenate([pad[len(tail) :], tail, features[rows]])
+            windows = np.lib.stride_tricks.sliding_window_view(history, L, axis=0)
+            Xt[rows] = windows.transpose(0, 2, 1).reshape(len(rows), L * k)
+        return Xt
 
 
 _hyperparams_schema = {
@@ -42,7 +148,12 @@ _hyperparams_schema = {
             "description": "This first object lists all constructor arguments with their types, but omits constraints for conditional hyperparameters.",
             "type": "object",
             "additionalProperties": False,
-            "required": ["lookback_window", "cache_last_window_trainset"],
+            "required": [
+                "lookback_window",
+                "cache_last_window_trainset",
+                "series_id_column",
+                "cache_size",
+            ],
             "relevantToOptimizer": ["lookback_window"],
             "properties": {
                 "lookback_window": {
@@ -55,6 +166,23 @@ _hyperparams_schema = {
                     "type": "boolean",
                     "default": False,
                 },
+                "series_id_column": {
+                    "description": """Column index of a series id. If given, the rows of X may belong to
+many series, the last window is cached per series id and every row is windowed
+together with the earlier rows and cached window of its own series. The id
+column is dropped from the output.""",
+                    "anyOf": [
+                        {"type": "integer", "minimum": 0},
+                        {"enum": [None], "description": "X is a single series."},
+                    ],
+                    "default": None,
+                },
+                "cache_size": {
+                    "description": "Maximum number of series whose last window is cached; the least recently used series is evicted first. The cache grows with the number of series seen up to this size. Only used when series_id_column is set.",
+                    "type": "integer",
+                    "minimum": 1,
+                    "default": 10000,
+                },
             },
         }
     ]
@@ -110,6 +238,7 @@ _combined_schemas = {
     "import_from": "autoai_ts_libs.sklearn.small_data_window_transformers",
     "type": "object",
     "tags": {"pre": [], "op": ["transformer"], "post": []},
+    "cost_model": cost_model_windows,
     "properties": {
         "hyperparams": _hyperparams_schema,
         "input_fit": _input_fit_schema,
@@ -16,21 +16,50 @@ from autoai_ts_libs.sklearn.small_data_standard_row_mean_center_transformers imp
     StandardRowMeanCenter as model_to_be_wrapped,
 )
 
+import numpy as np
+
 import lale.docstrings
 import lale.operators
 
+from . import _row_mean_center
+from ._common_schemas import schema_dtype
+
 
 class _StandardRowMeanCenterImpl:
-    def __init__(self, add_noise=True, noise_var=1e-5):
+    def __init__(self, add_noise=True, noise_var=1e-5, dtype=None):
         self._hyperparams = {"add_noise": add_noise, "noise_var": noise_var}
         self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
+        self._dtype = dtype
+        self._rng = np.random.default_rng(_row_mean_center._SEED)
 
     def fit(self, X, y=None):
-        self._wrapped_model.fit(X, y)
+        if self._dtype is None:
+            self._wrapped_model.fit(X, y)
+        else:
+            X = _row_mean_center.as_2d(X, self._dtype)
+            self._X_mu, self._X_std, self._zero_std_idx = _row_mean_center.row_stats(X)
         return self
 
     def transform(self, X, y=None):
-        return self._wrapped_model.transform(X, y)
+        if self._dtype is None:
+            return self._wrapped_model.transform(X, y)
+        Xt = _row_mean_center.as_2d(X, self._dtype, copy=True)
+        _row_mean_center.center_rows(
+            Xt,
+            self._X_mu,
+            self._X_std,
+            self._zero_std_idx,
+            self._rng,
+            **self._hyperparams,
+        )
+        if y is not None:
+            y = (np.asarray(y, dtype=self._dtype) - self._X_mu) / self._X_std
+        return Xt, y
+
+    def inverse_transform(self, y):
+        if self._dtype is None:
+            return self._wrapped_model.inverse_transform(y)
+        return np.asarray(y, dtype=self._dtype) * self._X_std + self._X_mu
 
 
 _hyperparams_schema = {
@@ -39,7 +68,7 @@ _hyperparams_schema = {
             "description": "This first object lists all constructor arguments with their types, but omits constraints for conditional hyperparameters.",
             "type": "object",
             "additionalProperties": False,
-            "required": ["add_noise", "noise_var"],
+            "required": ["add_noise", "noise_var", "dtype"],
             "relevantToOptimizer": [],
             "properties": {
                 "add_noise": {
@@ -52,6 +81,7 @@ _hyperparams_schema = {
                     "type": "number",
                     "default": 1e-5,
                 },
+                "dtype": schema_dtype,
             },
         }
     ]
@@ -16,21 +16,55 @@ from autoai_ts_libs.sklearn.small_data_standard_row_mean_center_transformers imp
     StandardRowMeanCenterMTS as model_to_be_wrapped,
 )
 
+import numpy as np
+
 import lale.docstrings
 import lale.operators
 
+from . import _row_mean_center
+from ._common_schemas import schema_dtype
+
 
 class _StandardRowMeanCenterMTSImpl:
-    def __init__(self, lookback_window=None):
+    def __init__(self, lookback_window=None, dtype=None):
         self._hyperparams = {"lookback_window": lookback_window}
         self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
+        self._dtype = dtype
+        self._rng = np.random.default_rng(_row_mean_center._SEED)
+
+    def _blocks(self, n_columns):
+        L = self._hyperparams["lookback_window"]
+        return [slice(i, i + L) for i in range(0, n_columns, L)]
 
     def fit(self, X, y=None):
-        self._wrapped_model.fit(X, y)
+        if self._dtype is None:
+            self._wrapped_model.fit(X, y)
+            return self
+        X = _row_mean_center.as_2d(X, self._dtype)
+        blocks = self._blocks(X.shape[1])
+        self._stats = [_row_mean_center.row_stats(X[:, b]) for b in blocks]
+        self._block_rngs = _row_mean_center.child_rngs(self._rng, len(blocks))
         return self
 
     def transform(self, X, y=None):
-        return self._wrapped_model.transform(X, y)
+        if self._dtype is None:
+            return self._wrapped_model.transform(X, y)
+        Xt = _row_mean_center.as_2d(X, self._dtype, copy=True)
+        blocks = self._blocks(Xt.shape[1])
+        for b, stats, rng in zip(blocks, self._stats, self._block_rngs):
+            _row_mean_center.center_rows(Xt[:, b], *stats, rng)
+        if y is not None:
+            y = _row_mean_center.as_2d(y, self._dtype, copy=True)
+            for j, (mu, std, _) in enumerate(self._stats[: y.shape[1]]):
+                y[:, j : j + 1] -= mu
+                y[:, j : j + 1] /= std
+        return Xt, y
+
+    def inverse_transform(self, y):
+        if self._dtype is None:
+            return self._wrapped_model.inverse_transform(y)
+        stats = [(mu, std) for mu, std, _ in self._stats]
+        return _row_mean_center.inverse_center(y, stats, 1, self._dtype)
 
 
 _hyperparams_schema = {
@@ -39,14 +73,15 @@ _hyperparams_schema = {
             "description": "This first object lists all constructor arguments with their types, but omits constraints for conditional hyperparameters.",
             "type": "object",
             "additionalProperties": False,
-            "required": ["lookback_window"],
+            "required": ["lookback_window", "dtype"],
             "relevantToOptimizer": [],
             "properties": {
                 "lookback_window": {
                     "description": "The number of time points to include in each of the generated feature windows.",
                     "anyOf": [{"type": "integer"}, {"enum": [None]}],
                     "default": None,
-                }
+                },
+                "dtype": schema_dtype,
             },
         }
     ]
@@ -19,6 +19,9 @@ from autoai_ts_libs.srom.estimators.time_series.models.T2RForecaster import (  #
 import lale.docstrings
 import lale.operators
 
+from ._common_schemas import cost_model_decomposition, schema_fidelity
+from ._fidelity import most_recent, window_rows
+
 
 class _T2RForecasterImpl:
     def __init__(
@@ -30,7 +33,10 @@ class _T2RForecasterImpl:
         residual="Linear",
         lookback_win="auto",
         prediction_win=12,
+        fidelity=1.0,
     ):
+        self._fidelity = fidelity
+        self._min_rows = window_rows(lookback_win, prediction_win)
         self._hyperparams = {
             "time_column": time_column,
             "feature_columns": feature_columns,
@@ -43,6 +49,7 @@ class _T2RForecasterImpl:
         self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
 
     def fit(self, X, y):
+        X, y = most_recent(self._fidelity, X, y, self._min_rows)
         self._wrapped_model.fit(X, y)
         return self
 
@@ -56,7 +63,7 @@ _hyperparams_schema = {
             "description": "This first object lists all constructor arguments with their types, but omits constraints for conditional hyperparameters.",
             "type": "object",
             "additionalProperties": False,
-            "required": ["time_column", "feature_columns", "target_columns", "trend", "residual", "lookback_win", "prediction_win"],
+            "required": ["time_column", "feature_columns", "target_columns", "trend", "residual", "lookback_win", "prediction_win", "fidelity"],
             "relevantToOptimizer": ["trend", "residual"],
             "properties": {
                 "time_column": {
@@ -94,6 +101,7 @@ _hyperparams_schema = {
                     "type": "integer",
                     "default": 12,
                 },
+                "fidelity": schema_fidelity,
             },
         }
     ]
@@ -151,6 +159,7 @@ _combined_schemas = {
     "import_from": "autoai_ts_libs.srom.estimators.time_series.models.T2RForecaster",
     "type": "object",
     "tags": {"pre": [], "op": ["estimator", "forecaster"], "post": []},
+    "cost_model": cost_model_decomposition,
     "properties": {
         "hyperparams": _hyperparams_schema,
         "input_fit": _input_fit_schema,
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
 from autoai_ts_libs.anomaly_detection.estimators.api.base import (  # type: ignore # noqa
     TSADPipeline as model_to_be_wrapped,
 )
@@ -20,6 +21,19 @@ import lale.docstrings
 import lale.operators
 
 
+def _fitted_threshold(step):
+    """The threshold that the window detector wrapped by step fixed at fit time,
+    or None unless it labels with a *_oneshot_label scoring method; the other
+    *_label methods derive each threshold from the preceding test scores."""
+    detector = getattr(step, "_wrapped_model", None)
+    method = getattr(detector, "scoring_method", None)
+    if not isinstance(method, str) or not method.endswith("_oneshot_label"):
+        return None
+    if not hasattr(detector, "training_error_"):
+        return None
+    return detector._get_threshold(detector.training_error_)
+
+
 class _TSADPipelineImpl:
     def __init__(self, steps, **kwargs):
         self._wrapped_model = model_to_be_wrapped(
@@ -33,6 +47,42 @@ class _TSADPipelineImpl:
     def predict(self, X=None, **predict_params):
         return self._wrapped_model.predict(X, **predict_params)
 
+    def predict_iter(self, X, chunk_size=100000, overlap=None, **predict_params):
+        """Yield (labels, scores) for consecutive chunks of chunk_size rows of X.
+
+        Each chunk is scored together with the `overlap` rows preceding it, which
+        default to lookback_win - 1 of the pipeline steps, so every time point sees
+        the same window as in a one-shot predict while only O(chunk_size + overlap)
+        rows are windowed at a time. Scores match anomaly_score on the whole
+        series. Each chunk is scored once and labeled -1 (anomaly) or 1 from its
+        scores with the threshold fixed at fit time, so labels match predict; this
+        requires a *_oneshot_label scoring method, as the thresholds of the other
+        *_label methods depend on all the preceding scores of X."""
+        threshold = _fitted_threshold(self._wrapped_model.steps[-1][1])
+        if threshold is None:
+            raise ValueError(
+                "predict_iter requires a window detector with a *_oneshot_label "
+                "scoring_method as the last step."
+            )
+        if overlap is None:
+            overlap = self._lookback_overlap()
+        for start in range(0, len(X), chunk_size):
+            end = min(start + chunk_size, len(X))
+            lo = max(start - overlap, 0)
+            X_chunk = X.iloc[lo:end] if hasattr(X, "iloc") else X[lo:end]
+            scores = self._wrapped_model.anomaly_score(X_chunk, **predict_params)
+            scores = scores[start - lo :]
+            yield np.where(scores > threshold, -1, 1), scores
+
+    def _lookback_overlap(self):
+        lookback_wins = [
+            step.get_params().get("lookback_win")
+            for _, step in self._wrapped_model.steps
+            if hasattr(step, "get_params")
+        ]
+        lookback_wins = [w for w in lookback_wins if isinstance(w, (int, np.integer))]
+        return max(lookback_wins, default=1) - 1
+
 
 _hyperparams_schema = {
     "allOf": [
@@ -19,23 +19,36 @@ from autoai_ts_libs.utils.ts_pipeline import (  # type: ignore # noqa
 import lale.docstrings
 import lale.operators
 
+from ..batching import batcher_for
+from ._step_timing import collect_timings, wrap_steps
+
 
 class _TSPipelineImpl:
-    def __init__(self, steps, feature_columns=[], target_columns=[], prediction_horizon=1, exogenous_state_=None, **kwargs):
+    def __init__(self, steps, feature_columns=[], target_columns=[], prediction_horizon=1, exogenous_state_=None, timing_callback=None, **kwargs):
         self._wrapped_model = model_to_be_wrapped(
-            steps=steps,
+            steps=wrap_steps(steps, timing_callback),
             feature_columns=feature_columns,
             target_columns=target_columns,
             prediction_horizon=prediction_horizon,
             exogenous_state_=exogenous_state_,
             **kwargs)
+        self._timing_callback = timing_callback
+        self.last_timings_ = None
 
     def fit(self, X, y=None, **fit_params):
-        self._wrapped_model.fit(X, y, **fit_params)
+        with collect_timings("fit", self._timing_callback) as timings:
+            self._wrapped_model.fit(X, y, **fit_params)
+        self.last_timings_ = timings
         return self
 
     def predict(self, X=None, **predict_params):
-        return self._wrapped_model.predict(X, **predict_params)
+        with collect_timings("predict", self._timing_callback) as timings:
+            result = self._wrapped_model.predict(X, **predict_params)
+        self.last_timings_ = timings
+        return result
+
+    async def apredict(self, X=None, **predict_params):
+        return await batcher_for(self).submit(X, **predict_params)
 
 
 _hyperparams_schema = {
@@ -72,6 +85,17 @@ _hyperparams_schema = {
                     "anyOf": [{"type": "array", "items": {"laleType": "Any"}}, {"enum": [None]}],
                     "default": None,
                 },
+                "timing_callback": {
+                    "description": "If given, the steps are timed and this is called after every fit and predict with the per-step timings also stored in last_timings_.",
+                    "anyOf": [
+                        {"laleType": "callable"},
+                        {
+                            "enum": [None],
+                            "description": "Do not time the steps; last_timings_ stays None.",
+                        },
+                    ],
+                    "default": None,
+                },
             },
         }
     ]
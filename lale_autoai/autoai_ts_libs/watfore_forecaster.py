@@ -19,6 +19,11 @@ from autoai_ts_libs.watfore.watfore_forecasters import (  # type: ignore # noqa
 import lale.docstrings
 import lale.operators
 
+from .. import watfore_session
+from ..batching import batcher_for
+from ._common_schemas import schema_fidelity
+from ._fidelity import most_recent, window_rows
+
 
 class _WatForeForecasterImpl:
     def __init__(
@@ -45,8 +50,16 @@ class _WatForeForecasterImpl:
         lookback_win=1,
         target_column_indices=-1,
         debug=False,
+        fidelity=1.0,
         **kwargs
     ):
+        self._fidelity = fidelity
+        self._min_rows = window_rows(
+            lookback_win,
+            prediction_horizon,
+            min_training_data,
+            samples_per_season * initial_training_seasons,
+        )
         # code from Wes to fix a specific handling in autoai_ts:
         if "_" in algorithm:
             algorithm_parts = algorithm.split("_")
@@ -80,12 +93,40 @@ class _WatForeForecasterImpl:
         self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
 
     def fit(self, X, y):
-        self._wrapped_model.fit(X, y)
+        watfore_session.session()
+        watfore_session.discard(self)
+        X, y = most_recent(self._fidelity, X, y, self._min_rows)
+        # the backend's fit keeps updating a fitted model unless told to reset it
+        self._wrapped_model.fit(X, y, _reset_model=True)
+        return self
+
+    def partial_fit(self, X, y=None):
+        """Advance a fitted model with new observations that follow its training data.
+
+        The state of the Holt-Winters, ARIMA or BATS model (level, trend, season,
+        errors) is updated one observation at a time from where fit left it, keeping
+        the estimated parameters, so the time taken is proportional to the new data
+        rather than the history; call fit to re-estimate the parameters. The first
+        call on an unfitted model is a regular fit."""
+        if not getattr(self._wrapped_model, "is_fitted_", False):
+            return self.fit(X, y)
+        watfore_session.session()
+        watfore_session.discard(self)
+        self._wrapped_model.fit(X, y, _reset_model=False)
         return self
 
     def predict(self, X=None, **predict_params):
+        watfore_session.session()
+        if not predict_params:
+            forecaster = watfore_session.forecaster_for(self)
+            result = None if forecaster is None else forecaster.predict(X)
+            if result is not None:
+                return result
         return self._wrapped_model.predict(X, **predict_params)
 
+    async def apredict(self, X=None, **predict_params):
+        return await batcher_for(self).submit(X, **predict_params)
+
     def predict_proba(self, X=None):
         return self._wrapped_model.predict_proba(X)
 
@@ -122,6 +163,7 @@ _hyperparams_schema = {
                 "lookback_win",
                 "target_column_indices",
                 "debug",
+                "fidelity",
             ],
             "relevantToOptimizer": [],
             "properties": {
@@ -305,6 +347,7 @@ are targets.""",
                     "default": -1,
                 },
                 "debug": {"description": """""", "type": "boolean", "default": False},
+                "fidelity": schema_fidelity,
             },
         }
     ]
@@ -403,3 +446,5 @@ WatForeForecaster = lale.operators.make_operator(
     _WatForeForecasterImpl, _combined_schemas
 )
 lale.docstrings.set_docstrings(WatForeForecaster)
+
+watfore_session.prewarm_in_background()
@@ -16,24 +16,54 @@ from autoai_ts_libs.sklearn.small_data_standard_row_mean_center_transformers imp
     WindowStandardRowMeanCenterUTS as model_to_be_wrapped,
 )
 
+import numpy as np
+
 import lale.docstrings
 import lale.operators
 
+from . import _row_mean_center
+from ._common_schemas import cost_model_windows, schema_dtype
+
 
 class _WindowStandardRowMeanCenterUTSImpl:
-    def __init__(self, lookback_window=10, prediction_horizon=1):
+    def __init__(self, lookback_window=10, prediction_horizon=1, dtype=None):
         self._hyperparams = {
             "lookback_window": lookback_window,
             "prediction_horizon": prediction_horizon,
         }
         self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
+        self._dtype = dtype
+        self._rng = np.random.default_rng(_row_mean_center._SEED)
 
     def fit(self, X, y=None):
-        self._wrapped_model.fit(X, y)
+        if self._dtype is None:
+            self._wrapped_model.fit(X, y)
+        self._stats = None
         return self
 
-    def transform(self, X, y=None):
-        return self._wrapped_model.transform(X, y)
+    def transform(self, X, y=None, out=None):
+        if self._dtype is None and out is None:
+            self._stats = None
+            return self._wrapped_model.transform(X, y)
+        dtype = out.dtype if self._dtype is None else self._dtype
+        X = _row_mean_center.as_2d(X, dtype)
+        if X.shape[1] != 1:
+            raise ValueError(
+                "Expected a univariate time series, got %d columns." % X.shape[1]
+            )
+        if y is not None:
+            y = _row_mean_center.as_2d(y, dtype)
+        Xt, yt, self._stats = _row_mean_center.window_center(
+            X, y, rngs=[self._rng], out=out, **self._hyperparams
+        )
+        return Xt, yt
+
+    def inverse_transform(self, y):
+        if self._stats is None:
+            return self._wrapped_model.inverse_transform(y)
+        width = self._hyperparams["prediction_horizon"]
+        dtype = self._stats[0][0].dtype
+        return _row_mean_center.inverse_center(y, self._stats, width, dtype)
 
 
 _hyperparams_schema = {
@@ -42,7 +72,7 @@ _hyperparams_schema = {
             "description": "This first object lists all constructor arguments with their types, but omits constraints for conditional hyperparameters.",
             "type": "object",
             "additionalProperties": False,
-            "required": ["prediction_horizon"],
+            "required": ["prediction_horizon", "dtype"],
             "relevantToOptimizer": ["lookback_window"],
             "properties": {
                 "lookback_window": {
@@ -55,6 +85,7 @@ _hyperparams_schema = {
                     "type": "integer",
                     "default": 1,
                 },
+                "dtype": schema_dtype,
             },
         }
     ]
@@ -110,6 +141,7 @@ _combined_schemas = {
     "import_from": "autoai_ts_libs.sklearn.small_data_standard_row_mean_center_transformers",
     "type": "object",
     "tags": {"pre": [], "op": ["transformer"], "post": []},
+    "cost_model": cost_model_windows,
     "properties": {
         "hyperparams": _hyperparams_schema,
         "input_fit": _input_fit_schema,
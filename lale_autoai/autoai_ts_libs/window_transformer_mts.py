@@ -19,21 +19,39 @@ from autoai_ts_libs.sklearn.small_data_standard_row_mean_center_transformers imp
 import lale.docstrings
 import lale.operators
 
+from . import _row_mean_center
+from ._common_schemas import cost_model_windows, schema_dtype
+
 
 class _WindowTransformerMTSImpl:
-    def __init__(self, lookback_window=None, prediction_horizon=1):
+    def __init__(self, lookback_window=None, prediction_horizon=1, dtype=None):
         self._hyperparams = {
             "lookback_window": lookback_window,
             "prediction_horizon": prediction_horizon,
         }
         self._wrapped_model = model_to_be_wrapped(**self._hyperparams)
+        self._dtype = dtype
 
     def fit(self, X, y=None):
-        self._wrapped_model.fit(X, y)
+        if self._dtype is None:
+            self._wrapped_model.fit(X, y)
         return self
 
     def transform(self, X, y=None):
-        return self._wrapped_model.transform(X, y)
+        if self._dtype is None:
+            return self._wrapped_model.transform(X, y)
+        if self._hyperparams["lookback_window"] is None:
+            raise ValueError("'lookback window' is None.")
+        X = _row_mean_center.as_2d(X, self._dtype)
+        if y is None:
+            return (
+                _row_mean_center.lagged_windows(
+                    X, self._hyperparams["lookback_window"]
+                ),
+                None,
+            )
+        y = _row_mean_center.as_2d(y, self._dtype)
+        return _row_mean_center.supervised_windows(X, y, **self._hyperparams)
 
 
 _hyperparams_schema = {
@@ -42,7 +60,7 @@ _hyperparams_schema = {
             "description": "This first object lists all constructor arguments with their types, but omits constraints for conditional hyperparameters.",
             "type": "object",
             "additionalProperties": False,
-            "required": ["prediction_horizon"],
+            "required": ["prediction_horizon", "dtype"],
             "relevantToOptimizer": ["lookback_window"],
             "properties": {
                 "lookback_window": {
@@ -55,6 +73,7 @@ _hyperparams_schema = {
                     "type": "integer",
                     "default": 1,
                 },
+                "dtype": schema_dtype,
             },
         }
     ]
@@ -111,6 +130,7 @@ _combined_schemas = {
     "import_from": "autoai_ts_libs.sklearn.small_data_standard_row_mean_center_transformers",
     "type": "object",
     "tags": {"pre": [], "op": ["transformer"], "post": []},
+    "cost_model": cost_model_windows,
     "properties": {
         "hyperparams": _hyperparams_schema,
         "input_fit": _input_fit_schema,
@@ -16,9 +16,13 @@ from autoai_ts_libs.anomaly_detection.estimators.watson_ts.window_ad  import (
     WindowedIsolationForest as model_to_be_wrapped,
 )
 from ._common_schemas import *
+from ._fidelity import most_recent, window_rows
 from autoai_ts_libs.deps.srom.preprocessing.ts_transformer import Flatten
 from autoai_ts_libs.deps.srom.anomaly_detection.generalized_anomaly_model import GeneralizedAnomalyModel
+import numpy as np
+from joblib import Parallel, delayed
 from sklearn.ensemble import IsolationForest
+from sklearn.utils import gen_batches, get_chunk_n_rows
 
 import lale.docstrings
 import lale.operators
@@ -26,6 +30,54 @@ import lale.operators
 RANDOM_STATE = 42
 
 
+class _ChunkedIsolationForest(IsolationForest):
+    """IsolationForest that scores windows in row chunks of bounded size,
+    evaluating up to n_jobs chunks concurrently in threads (tree traversal
+    releases the GIL)."""
+
+    def __init__(
+        self,
+        *,
+        n_estimators=100,
+        max_samples="auto",
+        contamination="auto",
+        max_features=1.0,
+        bootstrap=False,
+        n_jobs=None,
+        random_state=None,
+        verbose=0,
+        warm_start=False,
+        chunk_size=None,
+    ):
+        super().__init__(
+            n_estimators=n_estimators,
+            max_samples=max_samples,
+            contamination=contamination,
+            max_features=max_features,
+            bootstrap=bootstrap,
+            n_jobs=n_jobs,
+            random_state=random_state,
+            verbose=verbose,
+            warm_start=warm_start,
+        )
+        self.chunk_size = chunk_size
+
+    def score_samples(self, X):
+        n_samples = len(X)
+        chunk_size = self.chunk_size
+        if chunk_size is None:
+            chunk_size = get_chunk_n_rows(
+                row_bytes=16 * self._max_features, max_n_rows=n_samples
+            )
+        if chunk_size >= n_samples:
+            return super().score_samples(X)
+        scores = Parallel(n_jobs=self.n_jobs, prefer="threads")(
+            delayed(IsolationForest.score_samples)(self, X[batch])
+            for batch in gen_batches(n_samples, chunk_size)
+        )
+        return np.concatenate(scores)
+
+
 class _WindowedIsolationForestImpl:
     def __init__(
         self,
@@ -41,8 +93,14 @@ class _WindowedIsolationForestImpl:
         observation_window=10,
         scoring_method="otsu_label",
         scoring_threshold=2,
+        n_jobs=None,
+        max_samples="auto",
+        chunk_size=None,
+        fidelity=1.0,
         **kwargs
     ):
+        self._fidelity = fidelity
+        self._min_rows = window_rows(lookback_win, pred_win)
         if steps is None:
             steps = [
                 (
@@ -52,7 +110,12 @@ class _WindowedIsolationForestImpl:
                 (
                     "IsolationForest",
                     GeneralizedAnomalyModel(
-                        base_learner=IsolationForest(random_state=RANDOM_STATE),
+                        base_learner=_ChunkedIsolationForest(
+                            random_state=RANDOM_STATE,
+                            n_jobs=n_jobs,
+                            max_samples=max_samples,
+                            chunk_size=chunk_size,
+                        ),
                         fit_function="fit",
                         predict_function="decision_function",
                         score_sign=-1,
@@ -76,6 +139,7 @@ class _WindowedIsolationForestImpl:
         )
 
     def fit(self, X, y=None, **fit_params):
+        X, y = most_recent(self._fidelity, X, y, self._min_rows)
         self._wrapped_model.fit(X, y, **fit_params)
         return self
 
@@ -100,6 +164,7 @@ _hyperparams_schema = {
                 "observation_window",
                 "scoring_method",
                 "scoring_threshold",
+                "fidelity",
             ],
             "relevantToOptimizer": [],
             "properties": {
@@ -130,6 +195,57 @@ _hyperparams_schema = {
                 "observation_window": schema_observation_window,
                 "scoring_method": schema_scoring_method,
                 "scoring_threshold": schema_scoring_threshold,
+                "n_jobs": {
+                    "description": "Number of jobs to run in parallel when building the trees and when scoring window chunks. Only used when steps is None.",
+                    "anyOf": [
+                        {
+                            "description": "1 unless in joblib.parallel_backend context.",
+                            "enum": [None],
+                        },
+                        {"description": "Use all processors.", "enum": [-1]},
+                        {
+                            "description": "Number of CPU cores.",
+                            "type": "integer",
+                            "minimum": 1,
+                        },
+                    ],
+                    "default": None,
+                },
+                "max_samples": {
+                    "description": """Number of windows drawn to train each tree; a fixed count keeps training cost
+independent of the history length. Only used when steps is None.""",
+                    "anyOf": [
+                        {
+                            "description": "min(256, number of windows).",
+                            "enum": ["auto"],
+                        },
+                        {
+                            "description": "Number of windows, capped at the number of windows.",
+                            "type": "integer",
+                            "minimum": 1,
+                        },
+                        {
+                            "description": "Fraction of the windows.",
+                            "type": "number",
+                            "minimum": 0.0,
+                            "exclusiveMinimum": True,
+                            "maximum": 1.0,
+                        },
+                    ],
+                    "default": "auto",
+                },
+                "chunk_size": {
+                    "description": "Number of windows scored per chunk. Only used when steps is None.",
+                    "anyOf": [
+                        {"type": "integer", "minimum": 1},
+                        {
+                            "description": "Derived from sklearn's working_memory setting.",
+                            "enum": [None],
+                        },
+                    ],
+                    "default": None,
+                },
+                "fidelity": schema_fidelity,
             },
         }
     ]
@@ -16,6 +16,7 @@ from autoai_ts_libs.anomaly_detection.estimators.watson_ts.window_ad  import (
     WindowedLOF as model_to_be_wrapped,
 )
 from ._common_schemas import *
+from ._fidelity import most_recent, window_rows
 from autoai_ts_libs.deps.srom.preprocessing.ts_transformer import Flatten
 from autoai_ts_libs.deps.srom.anomaly_detection.generalized_anomaly_model import GeneralizedAnomalyModel
 from autoai_ts_libs.anomaly_detection.estimators.watson_ts.window_ad import ExtendedLocalOutlierFactor
@@ -40,8 +41,11 @@ class _WindowedLOFImpl:
         observation_window=10,
         scoring_method="otsu_label",
         scoring_threshold=2,
+        fidelity=1.0,
         **kwargs
     ):
+        self._fidelity = fidelity
+        self._min_rows = window_rows(lookback_win, pred_win)
         if steps is None:
             steps = [
                 (
@@ -75,6 +79,7 @@ class _WindowedLOFImpl:
         )
 
     def fit(self, X, y=None, **fit_params):
+        X, y = most_recent(self._fidelity, X, y, self._min_rows)
         self._wrapped_model.fit(X, y, **fit_params)
         return self
 
@@ -105,6 +110,7 @@ _hyperparams_schema = {
                 "observation_window",
                 "scoring_method",
                 "scoring_threshold",
+                "fidelity",
             ],
             "relevantToOptimizer": [],
             "properties": {
@@ -135,6 +141,7 @@ _hyperparams_schema = {
                 "observation_window": schema_observation_window,
                 "scoring_method": schema_scoring_method,
                 "scoring_threshold": schema_scoring_threshold,
+                "fidelity": schema_fidelity,
             },
         }
     ]
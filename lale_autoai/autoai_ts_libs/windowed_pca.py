@@ -12,10 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
+
+import numpy as np
 from autoai_ts_libs.anomaly_detection.estimators.watson_ts.window_ad  import (  # type: ignore # noqa
     WindowedPCA as model_to_be_wrapped,
 )
+from sklearn.decomposition import PCA, IncrementalPCA
+
 from ._common_schemas import *
+from ._fidelity import most_recent, window_rows
 from autoai_ts_libs.deps.srom.preprocessing.ts_transformer import Flatten
 from autoai_ts_libs.deps.srom.anomaly_detection.generalized_anomaly_model import GeneralizedAnomalyModel
 from autoai_ts_libs.deps.srom.anomaly_detection.algorithms.anomaly_pca import AnomalyPCA
@@ -27,6 +33,106 @@ import lale.operators
 RANDOM_STATE = 42
 
 
+class _ScalableAnomalyPCA(AnomalyPCA):
+    """AnomalyPCA that can fit its projection with a randomized or an
+    incremental solver instead of a full SVD over all flattened windows.
+
+    The projection is fitted with at most `max_components` components and then
+    truncated to `n_components` (a fraction of explained variance or a count),
+    so the anomaly scores are computed exactly as in AnomalyPCA."""
+
+    def __init__(
+        self,
+        contamination=0.1,
+        iterated_power="auto",
+        n_components=None,
+        random_state=RANDOM_STATE,
+        svd_solver="auto",
+        tol=0.0,
+        whiten=False,
+        anomaly_score_option="projected_l2",
+        solver="full",
+        batch_size=None,
+        max_components=None,
+    ):
+        super().__init__(
+            contamination=contamination,
+            iterated_power=iterated_power,
+            n_components=n_components,
+            random_state=random_state,
+            svd_solver=svd_solver,
+            tol=tol,
+            whiten=whiten,
+            anomaly_score_option=anomaly_score_option,
+        )
+        self.solver = solver
+        self.batch_size = batch_size
+        self.max_components = max_components
+
+    def fit(self, X, y=None):
+        if self.solver == "full":
+            return super().fit(X, y)
+        X = np.asarray(X)
+        k = self._max_components(X)
+        if self.solver == "randomized":
+            self.full_estimator_ = PCA(
+                n_components=k,
+                svd_solver="randomized",
+                iterated_power=self.iterated_power,
+                random_state=self.random_state,
+                whiten=self.whiten,
+            ).fit(X)
+        elif self.solver == "incremental":
+            self.full_estimator_ = IncrementalPCA(
+                n_components=k, whiten=self.whiten, batch_size=self.batch_size
+            ).fit(X)
+        else:
+            raise ValueError(f"Unknown solver {self.solver!r}.")
+        self.estimator_ = self._truncate(self.full_estimator_)
+        return self
+
+    def partial_fit(self, X, y=None):
+        if self.solver != "incremental":
+            raise ValueError("partial_fit requires solver='incremental'.")
+        X = np.asarray(X)
+        if not hasattr(self, "full_estimator_"):
+            self.full_estimator_ = IncrementalPCA(
+                n_components=self._max_components(X),
+                whiten=self.whiten,
+                batch_size=self.batch_size,
+            )
+        self.full_estimator_.partial_fit(X)
+        self.estimator_ = self._truncate(self.full_estimator_)
+        return self
+
+    def _max_components(self, X):
+        k = min(X.shape)
+        if self.max_components is not None:
+            k = min(k, self.max_components)
+        if isinstance(self.n_components, (int, np.integer)):
+            k = min(k, self.n_components)
+        return k
+
+    def _truncate(self, estimator):
+        ratio = estimator.explained_variance_ratio_
+        if self.n_components is None:
+            k = len(ratio)
+        elif 0 < self.n_components < 1:
+            k = int(np.searchsorted(np.cumsum(ratio), self.n_components, side="right")) + 1
+        else:
+            k = int(self.n_components)
+        k = min(k, len(ratio))
+        truncated = copy.copy(estimator)
+        truncated.components_ = estimator.components_[:k]
+        truncated.explained_variance_ = estimator.explained_variance_[:k]
+        truncated.explained_variance_ratio_ = ratio[:k]
+        truncated.singular_values_ = estimator.singular_values_[:k]
+        truncated.n_components_ = k
+        if k < len(ratio):
+            truncated.noise_variance_ = estimator.explained_variance_[k:].mean()
+        return truncated
+
+
 class _WindowedPCAImpl:
     def __init__(
         self,
@@ -42,9 +148,22 @@ class _WindowedPCAImpl:
         observation_window=10,
         scoring_method="otsu_label",
         scoring_threshold=2,
+        solver="full",
+        batch_size=None,
+        max_components=None,
+        fidelity=1.0,
         **kwargs
     ):
+        self._fidelity = fidelity
+        self._min_rows = window_rows(lookback_win, pred_win)
         if steps is None:
+            if solver == "full":
+                base_learner = AnomalyPCA(random_state=RANDOM_STATE, anomaly_score_option='reconstruction',
+                                          n_components=0.9)
+            else:
+                base_learner = _ScalableAnomalyPCA(random_state=RANDOM_STATE, anomaly_score_option='reconstruction',
+                                                   n_components=0.9, solver=solver, batch_size=batch_size,
+                                                   max_components=max_components)
             steps = [
                 (
                     "Flatten",
@@ -53,14 +172,16 @@ class _WindowedPCAImpl:
                 (
                     "PCA",
                     GeneralizedAnomalyModel(
-                        base_learner=AnomalyPCA(random_state=RANDOM_STATE, anomaly_score_option='reconstruction',
-                                                n_components=0.9),
+                        base_learner=base_learner,
                         fit_function="fit",
                         predict_function="decision_function",
                         score_sign=1,
                     ),
                 ),
             ]
+        self._steps = steps
+        self._lookback_win = lookback_win
+        self._lookback_tail = None
 
         self._wrapped_model = model_to_be_wrapped(
             steps=steps,
@@ -78,9 +199,34 @@ class _WindowedPCAImpl:
         )
 
     def fit(self, X, y=None, **fit_params):
+        X, y = most_recent(self._fidelity, X, y, self._min_rows)
         self._wrapped_model.fit(X, y, **fit_params)
+        self._lookback_tail = self._tail(np.asarray(X))
         return self
 
+    def partial_fit(self, X, y=None, **fit_params):
+        """Absorb a new batch of normal data into a fitted model with solver="incremental".
+
+        The batch is windowed together with the tail of the previously seen data,
+        so no window is lost at batch boundaries, and only the PCA projection is
+        updated; the first call on an unfitted model is a regular fit."""
+        if self._lookback_tail is None:
+            return self.fit(X, y, **fit_params)
+        base_learner = self._steps[-1][1].base_learner
+        if not hasattr(base_learner, "partial_fit"):
+            raise ValueError("partial_fit requires solver='incremental'.")
+        history = np.concatenate([self._lookback_tail, np.asarray(X)])
+        Xt, _ = self._steps[0][1].transform(history)
+        base_learner.partial_fit(Xt)
+        self._lookback_tail = self._tail(history)
+        backend = self._wrapped_model._wrapped_model
+        if getattr(backend, "lookback_data_X_", None) is not None:
+            backend.lookback_data_X_ = self._lookback_tail
+        return self
+
+    def _tail(self, X):
+        return X[max(len(X) - self._lookback_win + 1, 0):]
+
     def predict(self, X=None, prediction_type=PredictionTypes.Sliding.value):
         return self._wrapped_model.predict(X, prediction_type)
 
@@ -108,6 +254,7 @@ _hyperparams_schema = {
                 "observation_window",
                 "scoring_method",
                 "scoring_threshold",
+                "fidelity",
             ],
             "relevantToOptimizer": [],
             "properties": {
@@ -139,6 +286,31 @@ _hyperparams_schema = {
                 "observation_window": schema_observation_window,
                 "scoring_method": schema_scoring_method,
                 "scoring_threshold": schema_scoring_threshold,
+                "solver": {
+                    "description": """Solver used to fit the PCA projection when steps is None.
+"full" runs an exact SVD over all flattened windows, "randomized" uses a randomized SVD,
+and "incremental" fits in mini-batches and supports partial_fit.""",
+                    "enum": ["full", "randomized", "incremental"],
+                    "default": "full",
+                },
+                "batch_size": {
+                    "description": "Number of windows per mini-batch for solver=\"incremental\".",
+                    "anyOf": [
+                        {"type": "integer", "minimum": 1},
+                        {"enum": [None], "description": "5 times the number of window features."},
+                    ],
+                    "default": None,
+                },
+                "max_components": {
+                    "description": """Upper bound on the components fitted by the randomized and incremental solvers,
+before truncating to 90% explained variance. Smaller values are faster.""",
+                    "anyOf": [
+                        {"type": "integer", "minimum": 1},
+                        {"enum": [None], "description": "Number of window features."},
+                    ],
+                    "default": None,
+                },
+                "fidelity": schema_fidelity,
             },
         }
     ]
@@ -0,0 +1,132 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Asyncio predict with micro-batching for the forecasting operators.
+
+The forecasting operators have an ``apredict`` coroutine next to
+``predict``, reached through the trained operator's implementation:
+
+.. code:: Python
+
+    forecast = await trained.shallow_impl.apredict(X)
+
+Requests that arrive within ``window`` seconds of the first pending one
+form a batch. A forecaster's predict forecasts from the end of its own X,
+so the requests of a batch cannot be stacked into one X. Instead, requests
+with equal X and predict parameters, such as the common X=None "next
+forecast" request, are answered by a single predict call. The predict calls
+run in a thread pool of at most ``max_workers`` threads, so the event loop
+never blocks and the load on the model stays bounded.
+"""
+
+import asyncio
+import concurrent.futures
+import copy
+import functools
+import hashlib
+import weakref
+
+import numpy as np
+
+DEFAULT_WINDOW = 0.002
+
+_batchers = weakref.WeakKeyDictionary()
+
+
+def _request_key(X, params):
+    """Equal keys for requests that predict the same thing; requests whose
+    inputs cannot be compared cheaply get a key of their own."""
+    try:
+        params_key = tuple(sorted(params.items()))
+        hash(params_key)
+    except TypeError:
+        return object()
+    if X is None:
+        return (None, params_key)
+    try:
+        a = np.ascontiguousarray(np.asarray(X))
+    except (TypeError, ValueError):
+        return object()
+    if a.dtype.hasobject:
+        return object()
+    digest = hashlib.blake2b(a.data, digest_size=16).digest()
+    return (type(X), a.shape, a.dtype.str, digest, params_key)
+
+
+def _fan_out(futures, task):
+    for i, future in enumerate(futures):
+        if future.cancelled():
+            continue
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            # every requester gets its own copy of a shared result
+            future.set_result(task.result() if i == 0 else copy.copy(task.result()))
+
+
+class MicroBatcher:
+    """Coalesces the awaited predict requests that arrive within window
+    seconds of each other and runs the distinct ones in a bounded thread pool."""
+
+    def __init__(self, predict, window=DEFAULT_WINDOW, max_workers=1):
+        self._predict = predict
+        self.window = window
+        self._max_workers = max_workers
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+        self._pending = None
+
+    def configure(self, window=None, max_workers=None):
+        if window is not None:
+            self.window = window
+        if max_workers is not None and max_workers != self._max_workers:
+            self._executor.shutdown(wait=False)
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+            self._max_workers = max_workers
+        return self
+
+    async def submit(self, X=None, **predict_params):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if self._pending is None or self._pending[0] is not loop:
+            self._pending = (loop, [])
+            loop.call_later(self.window, self._flush, self._pending)
+        self._pending[1].append((X, predict_params, future))
+        return await future
+
+    def _flush(self, pending):
+        if self._pending is pending:
+            self._pending = None
+        loop, requests = pending
+        groups = {}
+        for X, params, future in requests:
+            key = _request_key(X, params)
+            groups.setdefault(key, (X, params, []))[2].append(future)
+        for X, params, futures in groups.values():
+            call = functools.partial(self._predict, X, **params)
+            task = loop.run_in_executor(self._executor, call)
+            task.add_done_callback(functools.partial(_fan_out, futures))
+
+
+def batcher_for(impl, window=None, max_workers=None):
+    """The MicroBatcher behind impl.apredict, created on first use;
+    window and max_workers reconfigure it."""
+    batcher = _batchers.get(impl)
+    if batcher is None:
+        ref = weakref.ref(impl)  # the batcher must not keep impl alive
+        batcher = MicroBatcher(lambda X, **params: ref().predict(X, **params))
+        _batchers[impl] = batcher
+    return batcher.configure(window, max_workers)
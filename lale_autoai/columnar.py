@@ -0,0 +1,142 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+pandas and Arrow inputs for the lale_autoai operators.
+
+The fit, predict and transform methods of the operators accept pandas
+DataFrames and Series and pyarrow Tables, RecordBatches and arrays next to
+numpy arrays. Inputs whose columns are all numeric, as told by the dtypes or
+the Arrow schema without looking at any element, reach the autoai_ts_libs
+models as numpy arrays:
+
+* a DataFrame whose columns share one dtype becomes a view of its data;
+* each numeric Arrow column without nulls in a single chunk is taken without
+  copying, and a single column is returned as a view; several columns are
+  placed side by side in one column-major array, a memory copy per column
+  rather than a conversion per element.
+
+Inputs with other columns, such as timestamps or strings, are passed on as
+DataFrames; Arrow ones are converted with ``to_pandas``. Operators that
+handle pandas themselves, keeping the column names and index in their
+outputs, set ``_accepts_pandas`` on their impl class; they receive pandas
+inputs unchanged and Arrow ones converted with ``to_pandas``. pyarrow itself
+is not required: Arrow objects are recognized by their type and pyarrow is
+only imported once one is seen.
+"""
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+from .profiling import PROFILED_METHODS
+
+_Y_METHODS = ("fit", "partial_fit")
+
+
+def is_arrow(X):
+    return type(X).__module__.split(".")[0] == "pyarrow"
+
+
+def _is_numeric_dtype(dtype):
+    return dtype.kind in "biuf"
+
+
+def _is_numeric_arrow_type(typ):
+    import pyarrow.types as pat
+
+    return pat.is_integer(typ) or pat.is_floating(typ) or pat.is_boolean(typ)
+
+
+def _arrow_column(column):
+    chunks = getattr(column, "chunks", [column])
+    if len(chunks) == 1:
+        # zero-copy unless the column has nulls or is boolean (bit-packed)
+        return chunks[0].to_numpy(zero_copy_only=False)
+    return column.to_numpy()
+
+
+def _from_arrow(X):
+    if not hasattr(X, "schema"):  # Array or ChunkedArray
+        if _is_numeric_arrow_type(X.type):
+            return _arrow_column(X)
+        return X.to_pandas()
+    if not all(_is_numeric_arrow_type(field.type) for field in X.schema):
+        return X.to_pandas()
+    columns = [_arrow_column(X.column(i)) for i in range(X.num_columns)]
+    if len(columns) == 1:
+        return columns[0].reshape(-1, 1)
+    result = np.empty(
+        (X.num_rows, len(columns)), dtype=np.result_type(*columns), order="F"
+    )
+    for i, column in enumerate(columns):
+        result[:, i] = column
+    return result
+
+
+def _from_pandas(X):
+    if isinstance(X, pd.Series):
+        return X.to_numpy(copy=False) if _is_numeric_dtype(X.dtype) else X
+    dtypes = list(X.dtypes)
+    if not dtypes or not all(_is_numeric_dtype(dtype) for dtype in dtypes):
+        return X
+    # a view of the data when the frame holds a single block
+    return X.to_numpy(dtype=np.result_type(*dtypes), copy=False)
+
+
+def to_numpy(X):
+    """X as a numpy array if it is a pandas or Arrow object with only
+    numeric columns, without copying the data where the layout allows;
+    other inputs are returned unchanged, except that Arrow ones become
+    pandas objects."""
+    if isinstance(X, (pd.DataFrame, pd.Series)):
+        return _from_pandas(X)
+    if is_arrow(X):
+        return _from_arrow(X)
+    return X
+
+
+def to_pandas(X):
+    """X as a pandas object if it is an Arrow one; other inputs are returned
+    unchanged."""
+    return X.to_pandas() if is_arrow(X) else X
+
+
+def _converted(method_name, method, convert):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        args = list(args)
+        names = ["X", "y"] if method_name in _Y_METHODS else ["X"]
+        for i, name in enumerate(names):
+            if i < len(args):
+                args[i] = convert(args[i])
+            elif name in kwargs:
+                kwargs[name] = convert(kwargs[name])
+        return method(self, *args, **kwargs)
+
+    wrapper._lale_autoai_columnar = True
+    return wrapper
+
+
+def accept_columnar(impl_class):
+    """Wrap the fit, predict and transform methods that impl_class defines
+    itself so that they receive pandas and Arrow inputs through to_numpy,
+    or through to_pandas if impl_class sets _accepts_pandas."""
+    convert = to_pandas if getattr(impl_class, "_accepts_pandas", False) else to_numpy
+    for name in PROFILED_METHODS:
+        method = impl_class.__dict__.get(name)
+        if callable(method) and not getattr(method, "_lale_autoai_columnar", False):
+            setattr(impl_class, name, _converted(name, method, convert))
+    return impl_class
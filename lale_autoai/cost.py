@@ -0,0 +1,309 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Fit cost models of the lale_autoai operators.
+
+The schemas of the operators with hyperparameters relevant to the optimizer
+carry a ``cost_model`` entry: an analytic form in the hyperparameters and the
+shape of the data, scaled by coefficients,
+
+.. code:: text
+
+    fit_seconds  = intercept_seconds + seconds_per_unit * units * factors
+    memory_bytes = bytes_per_cell * cells
+
+for fitting and, for transformers, transforming the training data, where
+units and cells are given by the form, e.g. n_rows * lookback_window *
+n_columns for the window transformers, and factors by the values of
+categorical hyperparameters such as the data_transformation_scheme of
+``FlattenAutoEnsembler``. The coefficients are rough defaults; ``calibrate``
+fits them to timed fits on the data at hand.
+
+``budgeted`` narrows the optimizer ranges of an operator to the
+configurations estimated to fit a time or memory budget, and adds a
+constraint ruling out the combinations of values in those ranges that
+together exceed it, so any lale optimizer skips them without trying them:
+
+.. code:: Python
+
+    from lale_autoai.cost import budgeted
+
+    op = budgeted(SmallDataWindowTransformer, *X.shape, time_budget=60)
+"""
+
+import itertools
+import time
+
+import numpy as np
+
+
+def _lookback(hyperparams, name, n_rows):
+    """The lookback of hyperparams[name]. The backend picks an "auto"
+    lookback on the data, so that is counted as the largest it could pick,
+    half the rows; a list of lookbacks is counted as its largest."""
+    value = hyperparams.get(name)
+    if value == "auto":
+        return max(n_rows // 2, 1)
+    if isinstance(value, (list, tuple)) and value:
+        value = max(value)
+    return value if isinstance(value, int) and value > 0 else 1
+
+
+def _n_columns(columns, n_columns):
+    if isinstance(columns, (list, tuple)) and columns and min(columns) >= 0:
+        return len(columns)
+    return n_columns
+
+
+def _windows(hyperparams, n_rows, n_columns):
+    cells = n_rows * _lookback(hyperparams, "lookback_window", n_rows) * n_columns
+    return cells, cells
+
+
+def _windowed_regression(hyperparams, n_rows, n_columns):
+    width = _lookback(hyperparams, "lookback_window", n_rows) * n_columns
+    return n_rows * width * width, n_rows * width
+
+
+def _flatten_ensemble(hyperparams, n_rows, n_columns):
+    features = _n_columns(hyperparams.get("feature_columns"), n_columns)
+    cells = n_rows * _lookback(hyperparams, "lookback_win", n_rows) * features
+    return cells * hyperparams.get("n_leaders_for_ensemble", 1), cells
+
+
+def _decomposition(hyperparams, n_rows, n_columns):
+    targets = _n_columns(hyperparams.get("target_columns"), n_columns)
+    return n_rows * targets, n_rows * n_columns
+
+
+_FORMS = {
+    "windows": _windows,
+    "windowed_regression": _windowed_regression,
+    "flatten_ensemble": _flatten_ensemble,
+    "decomposition": _decomposition,
+}
+
+
+def cost_model(op):
+    """The cost_model entry of the schema of op, or None."""
+    return op._schemas.get("cost_model")
+
+
+def _hyperparams(op, overrides):
+    return {**op.get_defaults(), **op.hyperparams(), **overrides}
+
+
+def _units(model, hyperparams, n_rows, n_columns):
+    units, cells = _FORMS[model["form"]](hyperparams, n_rows, n_columns)
+    for name, by_value in model.get("factors", {}).items():
+        units *= by_value.get(str(hyperparams.get(name)), 1.0)
+    return units, cells
+
+
+def _estimate(model, hyperparams, n_rows, n_columns):
+    units, cells = _units(model, hyperparams, n_rows, n_columns)
+    return {
+        "fit_seconds": model["intercept_seconds"] + model["seconds_per_unit"] * units,
+        "memory_bytes": model["bytes_per_cell"] * cells,
+    }
+
+
+def estimate(op, n_rows, n_columns, **hyperparams):
+    """The estimated fit_seconds and memory_bytes of fitting op, with the
+    given hyperparameters overriding its own, on n_rows x n_columns data."""
+    model = cost_model(op)
+    if model is None:
+        raise ValueError(f"Operator {op.name()} has no cost model.")
+    return _estimate(model, _hyperparams(op, hyperparams), n_rows, n_columns)
+
+
+def _fits(cost, time_budget, memory_budget):
+    return (time_budget is None or cost["fit_seconds"] <= time_budget) and (
+        memory_budget is None or cost["memory_bytes"] <= memory_budget
+    )
+
+
+def within_budget(
+    op, n_rows, n_columns, time_budget=None, memory_budget=None, **hyperparams
+):
+    cost = estimate(op, n_rows, n_columns, **hyperparams)
+    return _fits(cost, time_budget, memory_budget)
+
+
+def _largest_within(fits, low, high):
+    """The largest value in [low, high] for which the monotone fits holds,
+    or None."""
+    if not fits(low):
+        return None
+    while low < high:
+        middle = (low + high + 1) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _narrowed(schema, fits, n_rows):
+    """schema with its integer optimizer range or enum cut down to the
+    values for which fits holds, or None if no value does."""
+    if "anyOf" in schema:
+        branches = [_narrowed(s, fits, n_rows) for s in schema["anyOf"]]
+        branches = [s for s in branches if s is not None]
+        return {**schema, "anyOf": branches} if branches else None
+    if "enum" in schema:
+        values = [v for v in schema["enum"] if fits(v)]
+        return {**schema, "enum": values} if values else None
+    if schema.get("type") == "integer":
+        low, high = _integer_range(schema, n_rows)
+        largest = _largest_within(fits, low, high)
+        if largest is None:
+            return None
+        if largest == low:
+            return {**schema, "enum": [low]}
+        return {**schema, "minimumForOptimizer": low, "maximumForOptimizer": largest}
+    return schema
+
+
+def _integer_range(schema, n_rows):
+    return (
+        schema.get("minimumForOptimizer", schema.get("minimum", 1)),
+        schema.get("maximumForOptimizer", schema.get("maximum", n_rows)),
+    )
+
+
+def _choices(schema, n_rows):
+    """The enum values of schema and its integer optimizer range, or None
+    if it has none."""
+    branches = schema.get("anyOf", [schema])
+    values = [v for s in branches for v in s.get("enum", [])]
+    ranges = [_integer_range(s, n_rows) for s in branches if s.get("type") == "integer"]
+    return values, (ranges[0] if ranges else None)
+
+
+def _allowed(schema, value):
+    if "enum" in schema:
+        return value in schema["enum"]
+    return isinstance(value, int) and value <= schema["maximum"]
+
+
+def _combinations(fits, choices):
+    """The combinations of the choices of the hyperparameters for which fits
+    holds, each as a dict from name to an enum of one value or, for the one
+    hyperparameter with an integer range, the largest value that fits. The
+    cost grows with that value, so the smaller ones fit too. Hyperopt takes
+    no range of one value, so that is an enum too."""
+    integers = [name for name, (_, ints) in choices.items() if ints is not None]
+    if len(integers) > 1:
+        raise ValueError(
+            f"Cannot budget more than one integer hyperparameter: {integers}."
+        )
+    names = [name for name in choices if name not in integers]
+    result = []
+    for combo in itertools.product(*(choices[name][0] for name in names)):
+        fixed = dict(zip(names, combo))
+        enums = {name: {"enum": [value]} for name, value in fixed.items()}
+        if not integers:
+            found = [enums] if fits(fixed) else []
+        else:
+            name = integers[0]
+            values, (low, high) = choices[name]
+            found = [
+                {**enums, name: {"enum": [value]}}
+                for value in values
+                if fits({**fixed, name: value})
+            ]
+            largest = _largest_within(
+                lambda value: fits({**fixed, name: value}), low, high
+            )
+            if largest == low:
+                found.append({**enums, name: {"enum": [low]}})
+            elif largest is not None:
+                found.append({**enums, name: {"type": "integer", "maximum": largest}})
+        result.extend(found)
+    return result
+
+
+def budgeted(op, n_rows, n_columns, time_budget=None, memory_budget=None):
+    """op with the schemas of its hyperparameters relevant to the optimizer
+    narrowed to the values estimated to fit within the budgets on n_rows x
+    n_columns data in some combination with the others, and with a
+    constraint allowing only the combinations that fit together."""
+    model = cost_model(op)
+    if model is None:
+        return op
+    hyperparams = _hyperparams(op, {})
+    relevant = op.hyperparam_schema()["allOf"][0].get("relevantToOptimizer", [])
+    if not relevant:
+        return op
+
+    def fits(values):
+        cost = _estimate(model, {**hyperparams, **values}, n_rows, n_columns)
+        return _fits(cost, time_budget, memory_budget)
+
+    choices = {name: _choices(op.hyperparam_schema(name), n_rows) for name in relevant}
+    combinations = _combinations(fits, choices)
+    if not combinations:
+        raise ValueError(
+            f"No configuration of {op.name()} is estimated to fit the budget."
+        )
+    narrowed = {}
+    for name in relevant:
+
+        def allowed(value, name=name):
+            return any(_allowed(c[name], value) for c in combinations)
+
+        narrowed[name] = _narrowed(op.hyperparam_schema(name), allowed, n_rows)
+    if len(relevant) == 1:
+        return op.customize_schema(**narrowed)
+    constraint = {
+        "description": "The combinations estimated to fit the budget.",
+        "anyOf": [
+            {"type": "object", "properties": combination}
+            for combination in combinations
+        ],
+    }
+    return op.customize_schema(constraint=constraint, **narrowed)
+
+
+def calibrate(op, X, y=None, configs=({},)):
+    """op with the coefficients of its cost model fit by least squares to
+    the measured times of fitting op, and transforming X for transformers,
+    with each of the hyperparameter dicts in configs, on X and y."""
+    model = cost_model(op)
+    if model is None:
+        raise ValueError(f"Operator {op.name()} has no cost model.")
+    n_rows, n_columns = np.shape(X)[0], (np.shape(X) + (1,))[1]
+    rows = []
+    for config in configs:
+        units, _ = _units(model, _hyperparams(op, config), n_rows, n_columns)
+        start = time.perf_counter()
+        trained = op(**{**op.hyperparams(), **config}).fit(X, y)
+        if op.is_transformer():
+            trained.transform(X)
+        rows.append((units, time.perf_counter() - start))
+    A = np.array([[1.0, units] for units, _ in rows])
+    seconds = np.array([s for _, s in rows])
+    if len(rows) == 1 or np.ptp(A[:, 1]) == 0:
+        intercept, slope = 0.0, seconds.mean() / max(A[:, 1].mean(), 1.0)
+    else:
+        intercept, slope = np.linalg.lstsq(A, seconds, rcond=None)[0]
+    result = op.customize_schema()
+    result._schemas["cost_model"] = {
+        **model,
+        "intercept_seconds": max(float(intercept), 0.0),
+        "seconds_per_unit": max(float(slope), 0.0),
+    }
+    return result
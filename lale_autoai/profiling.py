@@ -0,0 +1,261 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Opt-in profiling of the fit, predict and transform calls of the
+lale_autoai operators.
+
+Each call records its wall time, CPU time, growth of the peak resident set
+size, the shape of X, and the bytes of the returned arrays that do not share
+memory with X. Profiling is off by default and costs one list check per call.
+
+Enable it for a block of code:
+
+.. code:: Python
+
+    from lale_autoai.profiling import profile
+
+    with profile() as p:
+        trained.predict(X)
+    p.to_openmetrics("predict.prom")
+    p.to_chrome_trace("predict.trace.json")
+
+or for a whole process by setting the environment variable
+``LALE_AUTOAI_PROFILE`` to a path prefix; the process then writes
+``<prefix>.prom`` and ``<prefix>.trace.json`` when it exits. The trace can be
+opened in chrome://tracing or Perfetto, where calls of nested operators such
+as the steps of an ``AutoaiTSPipeline`` appear inside the calls of their
+pipeline.
+"""
+
+import atexit
+import contextlib
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+
+PROFILED_METHODS = (
+    "fit",
+    "partial_fit",
+    "predict",
+    "predict_proba",
+    "predict_all",
+    "transform",
+    "inverse_transform",
+    "anomaly_score",
+    "decision_function",
+    "score_samples",
+)
+
+_ENV_VAR = "LALE_AUTOAI_PROFILE"
+
+# kilobytes on Linux, bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+_active = []
+
+
+class Profile:
+    """The records of the operator calls made while the profile was active,
+    one dict per call in order of completion."""
+
+    def __init__(self):
+        self.records = []
+
+    def _totals(self):
+        totals = {}
+        for r in self.records:
+            key = (r["operator"], r["method"])
+            t = totals.setdefault(
+                key,
+                {"calls": 0, "wall": 0.0, "cpu": 0.0, "bytes": 0, "rss": 0},
+            )
+            t["calls"] += 1
+            t["wall"] += r["wall_seconds"]
+            t["cpu"] += r["cpu_seconds"]
+            t["bytes"] += r["bytes_copied"]
+            t["rss"] = max(t["rss"], r["peak_rss_delta_bytes"])
+        return totals
+
+    def to_openmetrics(self, path=None):
+        """Totals per operator and method in the OpenMetrics text format,
+        written to path if given."""
+        families = [
+            ("lale_autoai_calls", "counter", "calls", "Operator calls."),
+            (
+                "lale_autoai_wall_seconds",
+                "counter",
+                "wall",
+                "Wall time spent in operator calls.",
+            ),
+            (
+                "lale_autoai_cpu_seconds",
+                "counter",
+                "cpu",
+                "Process CPU time spent in operator calls.",
+            ),
+            (
+                "lale_autoai_copied_bytes",
+                "counter",
+                "bytes",
+                "Bytes of returned arrays not sharing memory with X.",
+            ),
+            (
+                "lale_autoai_peak_rss_delta_bytes",
+                "gauge",
+                "rss",
+                "Largest growth of the peak resident set size during one call.",
+            ),
+        ]
+        totals = self._totals()
+        lines = []
+        for name, kind, field, help_text in families:
+            lines.append("# TYPE %s %s" % (name, kind))
+            lines.append("# HELP %s %s" % (name, help_text))
+            suffix = "_total" if kind == "counter" else ""
+            for (operator, method), t in sorted(totals.items()):
+                lines.append(
+                    '%s%s{operator="%s",method="%s"} %s'
+                    % (name, suffix, operator, method, t[field])
+                )
+        lines.append("# EOF")
+        text = "\n".join(lines) + "\n"
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def to_chrome_trace(self, path=None):
+        """The calls as complete events of the Chrome trace event format,
+        written to path as JSON if given."""
+        events = [
+            {
+                "name": "%s.%s" % (r["operator"], r["method"]),
+                "cat": "lale_autoai",
+                "ph": "X",
+                "ts": r["start_us"],
+                "dur": r["wall_seconds"] * 1e6,
+                "pid": r["pid"],
+                "tid": r["thread"],
+                "args": {
+                    "cpu_seconds": r["cpu_seconds"],
+                    "peak_rss_delta_bytes": r["peak_rss_delta_bytes"],
+                    "shape": r["shape"],
+                    "bytes_copied": r["bytes_copied"],
+                },
+            }
+            for r in self.records
+        ]
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        if path is not None:
+            with open(path, "w") as f:
+                json.dump(trace, f)
+        return trace
+
+
+@contextlib.contextmanager
+def profile():
+    """Record the operator calls made inside the with block."""
+    p = Profile()
+    _active.append(p)
+    try:
+        yield p
+    finally:
+        _active.remove(p)
+
+
+def _peak_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+
+def _arrays(result):
+    if isinstance(result, tuple):
+        return [a for a in result if isinstance(a, np.ndarray)]
+    return [result] if isinstance(result, np.ndarray) else []
+
+
+def _profiled(operator, method_name, method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not _active:
+            return method(self, *args, **kwargs)
+        X = args[0] if args else kwargs.get("X")
+        rss, cpu = _peak_rss(), time.process_time()
+        start = time.perf_counter()
+        result = method(self, *args, **kwargs)
+        wall = time.perf_counter() - start
+        cpu = time.process_time() - cpu
+        copied = sum(
+            a.nbytes
+            for a in _arrays(result)
+            if not (isinstance(X, np.ndarray) and np.may_share_memory(a, X))
+        )
+        record = {
+            "operator": operator,
+            "method": method_name,
+            "start_us": start * 1e6,
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "peak_rss_delta_bytes": _peak_rss() - rss,
+            "shape": list(getattr(X, "shape", ())),
+            "bytes_copied": copied,
+            "pid": os.getpid(),
+            "thread": threading.get_ident(),
+        }
+        for p in tuple(_active):
+            p.records.append(record)
+        return result
+
+    wrapper._lale_autoai_profiled = True
+    return wrapper
+
+
+def operator_name(impl_class):
+    """The name under which the calls of impl_class are recorded."""
+    operator = impl_class.__name__.strip("_")
+    if operator.endswith("Impl"):
+        operator = operator[: -len("Impl")]
+    return operator
+
+
+def instrument(impl_class):
+    """Wrap the fit, predict and transform methods that impl_class defines
+    itself so that they are recorded by the active profiles."""
+    operator = operator_name(impl_class)
+    for name in PROFILED_METHODS:
+        method = impl_class.__dict__.get(name)
+        if callable(method) and not getattr(method, "_lale_autoai_profiled", False):
+            setattr(impl_class, name, _profiled(operator, name, method))
+    return impl_class
+
+
+def _profile_process(prefix):
+    p = Profile()
+    _active.append(p)
+
+    def export():
+        p.to_openmetrics(prefix + ".prom")
+        p.to_chrome_trace(prefix + ".trace.json")
+
+    atexit.register(export)
+
+
+if os.environ.get(_ENV_VAR):
+    _profile_process(os.environ[_ENV_VAR])
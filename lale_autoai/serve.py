@@ -0,0 +1,423 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local HTTP runtime for fitted pipelines such as ``AutoaiTSPipeline`` and
+``TSADPipeline``.
+
+.. code:: shell
+
+    python -m lale_autoai.serve --model forecast=model.pkl --workers 4
+
+loads every pickled model once in the parent process, freezes the garbage
+collector so that the loaded objects are never written to by collections,
+and then forks the workers, which share the model memory copy-on-write and
+accept connections on one listening socket. Loading models that need the
+JVM of the WatFore operators, which forked workers could not use, is first
+tried in a throwaway child; if it launches the JVM, each worker loads its
+own copy of the models after the fork instead, which also warms up its JVM.
+Endpoints:
+
+* ``POST /v1/models/<name>/predict`` with a JSON body
+  ``{"X": [[...], ...] or null, "params": {...}}`` returns
+  ``{"predictions": [...]}``.
+* ``GET /v1/models`` lists the model names.
+* ``GET /metrics`` returns the per-model request latency histograms and
+  queue depths of the answering worker in the OpenMetrics text format.
+* ``GET /healthz`` returns 200.
+
+Each model has its own queue: a MicroBatcher from lale_autoai.batching that
+coalesces equal requests arriving within ``--window`` seconds and runs the
+distinct ones on at most ``--threads`` threads; requests beyond
+``--queue-limit`` pending ones are rejected with 503, and requests whose
+predict takes longer than ``--timeout`` seconds are answered with 504.
+``load_test`` drives a server on localhost and reports latency percentiles.
+"""
+
+import argparse
+import asyncio
+import bisect
+import concurrent.futures
+import functools
+import gc
+import http.server
+import json
+import os
+import pickle
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+from .batching import DEFAULT_WINDOW, MicroBatcher
+from .watfore_session import jvm_started
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class _Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.sum += value
+
+    def lines(self, name, labels):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append('%s_bucket{%s,le="%s"} %d' % (name, labels, le, cumulative))
+        lines.append("%s_count{%s} %d" % (name, labels, cumulative))
+        lines.append("%s_sum{%s} %s" % (name, labels, total))
+        return lines
+
+
+class _ModelQueue:
+    def __init__(self, model, window, threads, queue_limit):
+        self.batcher = MicroBatcher(model.predict, window=window, max_workers=threads)
+        self.latency = _Histogram()
+        self.queue_limit = queue_limit
+        self.pending = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            if self.pending >= self.queue_limit:
+                return False
+            self.pending += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.pending -= 1
+
+
+class _QueueFull(Exception):
+    pass
+
+
+class _Runtime:
+    """The per-worker state: one queue per model and the event loop, on a
+    thread of its own, that their batchers run on."""
+
+    def __init__(self, models, window, threads, queue_limit, timeout):
+        self.timeout = timeout
+        self.queues = {
+            name: _ModelQueue(model, window, threads, queue_limit)
+            for name, model in models.items()
+        }
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def predict(self, name, X, params):
+        queue = self.queues[name]
+        if not queue.enter():
+            raise _QueueFull(name)
+        start = time.perf_counter()
+        try:
+            future = asyncio.run_coroutine_threadsafe(
+                queue.batcher.submit(X, **params), self.loop
+            )
+            try:
+                return future.result(self.timeout)
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                raise
+        finally:
+            queue.latency.observe(time.perf_counter() - start)
+            queue.leave()
+
+    def metrics(self):
+        lines = [
+            "# TYPE lale_autoai_serve_request_seconds histogram",
+            "# HELP lale_autoai_serve_request_seconds Latency of predict requests.",
+        ]
+        for name, queue in sorted(self.queues.items()):
+            labels = 'model="%s",worker="%d"' % (name, os.getpid())
+            lines += queue.latency.lines("lale_autoai_serve_request_seconds", labels)
+        lines += [
+            "# TYPE lale_autoai_serve_pending_requests gauge",
+            "# HELP lale_autoai_serve_pending_requests Requests in a model queue.",
+        ]
+        for name, queue in sorted(self.queues.items()):
+            labels = 'model="%s",worker="%d"' % (name, os.getpid())
+            lines.append(
+                "lale_autoai_serve_pending_requests{%s} %d" % (labels, queue.pending)
+            )
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    runtime: _Runtime
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        data = body.encode() if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({"error": message}))
+
+    def do_GET(self):
+        if self.path == "/healthz":
+            self._send(200, "ok", "text/plain")
+        elif self.path == "/v1/models":
+            self._send(200, json.dumps({"models": sorted(self.runtime.queues)}))
+        elif self.path == "/metrics":
+            content_type = "application/openmetrics-text; version=1.0.0"
+            self._send(200, self.runtime.metrics(), content_type)
+        else:
+            self._error(404, "not found")
+
+    def do_POST(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 4 or parts[:2] != ["v1", "models"] or parts[3] != "predict":
+            return self._error(404, "not found")
+        name = parts[2]
+        if name not in self.runtime.queues:
+            return self._error(404, "unknown model %s" % name)
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            X = request.get("X")
+            X = None if X is None else np.asarray(X)
+            params = request.get("params") or {}
+        except (ValueError, AttributeError) as e:
+            return self._error(400, str(e))
+        try:
+            result = self.runtime.predict(name, X, params)
+        except _QueueFull:
+            return self._error(503, "queue of model %s is full" % name)
+        except concurrent.futures.TimeoutError:
+            return self._error(504, "predict of model %s timed out" % name)
+        except Exception as e:
+            return self._error(500, "%s: %s" % (type(e).__name__, e))
+        self._send(200, json.dumps({"predictions": np.asarray(result).tolist()}))
+
+
+class _Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+def load_models(specs):
+    """Unpickle the models given as name=path strings."""
+    models = {}
+    for spec in specs:
+        name, sep, path = spec.partition("=")
+        if not sep:
+            raise ValueError("Expected name=path, got %s." % spec)
+        with open(path, "rb") as f:
+            models[name] = pickle.load(f)
+    return models
+
+
+def _stop(signum, frame):
+    raise SystemExit(0)
+
+
+def _serve_worker(sock, models, window, threads, queue_limit, timeout):
+    # Replaces the handler the JVM installs, which crashes forwarding SIGTERM.
+    signal.signal(signal.SIGTERM, _stop)
+    handler = type(
+        "Handler",
+        (_Handler,),
+        {"runtime": _Runtime(models, window, threads, queue_limit, timeout)},
+    )
+    server = _Server(sock.getsockname(), handler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock
+    server.serve_forever()
+
+
+def _loading_starts_jvm(load):
+    """Whether load launches the JVM, found out in a forked child so that
+    this process stays free of it."""
+    pid = os.fork()
+    if pid == 0:
+        code = 2
+        try:
+            os.environ["LALE_AUTOAI_WATFORE_PREWARM"] = "0"
+            load()
+            code = 1 if jvm_started() else 0
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    return (os.WEXITSTATUS(status) if os.WIFEXITED(status) else -1) == 1
+
+
+def serve(
+    models,
+    host="127.0.0.1",
+    port=8080,
+    workers=1,
+    window=DEFAULT_WINDOW,
+    threads=1,
+    queue_limit=1024,
+    timeout=60.0,
+):
+    """Serve the fitted models, a dict from names to objects with a predict
+    method or a callable returning one, from workers processes sharing one
+    listening socket. With several workers, models that need the JVM must
+    be given as a callable, which each worker then calls after the fork.
+    Requests whose predict takes longer than timeout seconds are answered
+    with 504."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(socket.SOMAXCONN)
+    if workers == 1:
+        _serve_worker(
+            sock,
+            models() if callable(models) else models,
+            window,
+            threads,
+            queue_limit,
+            timeout,
+        )
+        return
+    if callable(models) and not _loading_starts_jvm(models):
+        models = models()
+    if not callable(models) and jvm_started():
+        raise RuntimeError(
+            "The JVM of the WatFore operators is running, and forked workers could "
+            "not use it; pass a callable loading the models instead."
+        )
+    # Keep the collector from touching, and so copying, the model pages.
+    gc.collect()
+    gc.freeze()
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _serve_worker(
+                    sock,
+                    models() if callable(models) else models,
+                    window,
+                    threads,
+                    queue_limit,
+                    timeout,
+                )
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for child in children:
+            os.kill(child, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for child in children:
+        os.waitpid(child, 0)
+
+
+def load_test(url, X=None, params=None, requests=1000, concurrency=16):
+    """POST requests predict requests to url from concurrency threads and
+    return the throughput and latency percentiles in seconds."""
+    body = json.dumps(
+        {"X": None if X is None else np.asarray(X).tolist(), "params": params or {}}
+    ).encode()
+
+    def one(_):
+        request = urllib.request.Request(
+            url, data=body, headers={"Content-Type": "application/json"}
+        )
+        start = time.perf_counter()
+        with urllib.request.urlopen(request) as response:
+            response.read()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as pool:
+        latencies = np.array(list(pool.map(one, range(requests))))
+    elapsed = time.perf_counter() - start
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {
+        "requests_per_second": requests / elapsed,
+        "p50": p50,
+        "p90": p90,
+        "p99": p99,
+        "max": latencies.max(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m lale_autoai.serve")
+    parser.add_argument(
+        "--model",
+        action="append",
+        required=True,
+        help="name=path of a pickled fitted model; may be repeated",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--window",
+        type=float,
+        default=DEFAULT_WINDOW,
+        help="seconds during which requests are coalesced",
+    )
+    parser.add_argument(
+        "--threads", type=int, default=1, help="predict threads per model and worker"
+    )
+    parser.add_argument(
+        "--queue-limit",
+        type=int,
+        default=1024,
+        help="pending requests per model and worker before answering 503",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="seconds a predict request may take before answering 504",
+    )
+    args = parser.parse_args(argv)
+    serve(
+        functools.partial(load_models, args.model),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        window=args.window,
+        threads=args.threads,
+        queue_limit=args.queue_limit,
+        timeout=args.timeout,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+# Copyright 2024 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A process-wide session with the Java backend of the WatFore operators.
+
+``WatForeForecaster`` and ``PointwiseBoundedAnomalyDetector`` run their
+Holt-Winters, ARIMA and BATS models in a JVM reached through JPype. The JVM is
+launched lazily by the first call that needs it, and the first fits and
+forecasts of each algorithm also pay for class loading and JIT compilation,
+so the first small predictions of a process are slow. A JVM cannot be
+restarted within a process, so there is exactly one session per process,
+shared by all operators and threads. A JVM does not survive os.fork either:
+a process forked after the JVM was launched cannot use it, and session
+raises RuntimeError there, so load WatFore models after forking, as
+lale_autoai.serve does for its workers.
+
+Importing either operator starts a daemon thread that launches the JVM and
+runs one small fit and forecast of each algorithm; calls of the operators
+wait for it rather than race it. Set the environment variable
+``LALE_AUTOAI_WATFORE_PREWARM`` to ``0`` to launch the JVM on first use
+instead.
+
+Forecasts of a trained ``WatForeForecaster`` from new observations X
+normally update copies of its models one value per JVM call. When the
+models see the raw values of X, that is, without log transform, exogenous
+features or a timestamp column, the copies are instead restored from the
+cached fitted state and updated with one bulk call per target, the
+timestamps and values of X marshalled as two primitive Java arrays. The
+first bulk forecast of a model is checked against the per-value one, and the
+model falls back to the latter on any difference. ``benchmark`` reports the
+per-call time of both paths:
+
+.. code:: Python
+
+    from lale_autoai.watfore_session import benchmark
+
+    benchmark(trained, X_new)
+"""
+
+import os
+import sys
+import threading
+import time
+import weakref
+
+import numpy as np
+
+_ENV_VAR = "LALE_AUTOAI_WATFORE_PREWARM"
+
+_TIMESERIES = "com.ibm.research.time_series.forecasting.timeseries.Timeseries"
+
+_PREWARM_ALGORITHMS = ("hw", "arima", "bats")
+
+_lock = threading.RLock()
+_session = None
+_prewarm_thread = None
+_inherited_jvm = False
+
+_forecasters = weakref.WeakKeyDictionary()
+
+
+def jvm_started():
+    """Whether the JVM was launched in this process, or in the process it
+    was forked from; does not import JPype."""
+    jpype = sys.modules.get("jpype")
+    return jpype is not None and jpype.isJVMStarted()
+
+
+def _after_fork_in_child():
+    global _lock, _session, _prewarm_thread, _inherited_jvm
+    _lock = threading.RLock()  # may have been held by a thread of the parent
+    _session = None
+    _prewarm_thread = None
+    _inherited_jvm = jvm_started()
+    _forecasters.clear()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class Session:
+    """The launched JVM with the Java classes used for bulk marshalling."""
+
+    def __init__(self):
+        import jpype
+        from autoai_ts_libs.deps import tspy  # type: ignore # noqa
+
+        tspy.ts_context.java_bridge  # launches the JVM
+        self._long_array = jpype.JArray(jpype.JLong)
+        self._double_array = jpype.JArray(jpype.JDouble)
+        self._timeseries = jpype.JClass(_TIMESERIES)
+
+    def timeseries(self, time_units, timestamps, values):
+        """A Java Timeseries of the int64 timestamps and float64 values,
+        each copied into the JVM as one primitive array."""
+        return self._timeseries(
+            time_units,
+            self._long_array(np.ascontiguousarray(timestamps, dtype=np.int64)),
+            self._double_array(np.ascontiguousarray(values, dtype=np.float64)),
+        )
+
+
+def session():
+    """The session of this process, launching the JVM on first use."""
+    global _session
+    with _lock:
+        if _inherited_jvm:
+            raise RuntimeError(
+                "This process was forked after the JVM of the WatFore operators "
+                "was launched and cannot use it; load WatFore models after forking."
+            )
+        if _session is None:
+            _session = Session()
+        return _session
+
+
+def _warm_up():
+    from autoai_ts_libs.watfore.watfore_forecasters import (  # type: ignore # noqa
+        WatForeForecaster,
+    )
+
+    X = (2.0 + np.sin(np.arange(256) / 3.0)).reshape(-1, 1)
+    for algorithm in _PREWARM_ALGORITHMS:
+        model = WatForeForecaster(algorithm=algorithm, log_transform=False)
+        model.fit(X[:240], X[:240])
+        model.predict(X[240:])
+        forecaster = _BulkForecaster.of(model)
+        if forecaster is not None:
+            forecaster.forecast(X[240:])
+
+
+def prewarm():
+    """Launch the JVM and run one small fit and forecast of each algorithm,
+    unless that already happened in this process."""
+    with _lock:
+        first = _session is None
+        session()
+        if first:
+            try:
+                _warm_up()
+            except Exception:  # a failed warm-up only costs the first call
+                pass
+
+
+def _prewarm_and_detach():
+    try:
+        prewarm()
+    except Exception:  # the first call of an operator reports the failure
+        pass
+    finally:
+        # an attached thread would keep the JVM, and so the process, from exiting
+        if jvm_started() and sys.modules["jpype"].isThreadAttachedToJVM():
+            sys.modules["jpype"].java.lang.Thread.detach()
+
+
+def prewarm_in_background():
+    """Start prewarm in a daemon thread, once per process, unless disabled
+    by the environment variable."""
+    global _prewarm_thread
+    if os.environ.get(_ENV_VAR, "1") == "0" or _inherited_jvm:
+        return
+    with _lock:
+        if _prewarm_thread is None and _session is None:
+            _prewarm_thread = threading.Thread(
+                target=_prewarm_and_detach, name="watfore-prewarm", daemon=True
+            )
+            _prewarm_thread.start()
+
+
+class _BulkForecaster:
+    """Forecasts of a fitted backend WatForeForecaster from copies of its
+    models restored from their fitted state and updated in bulk."""
+
+    def __init__(self, wrapped, targets):
+        self._wrapped = weakref.ref(wrapped)
+        self._targets = targets
+        self._states = [(type(m), m.__getstate__()) for m in wrapped.model]
+        fitted = [m._j_fm for m in wrapped.model]
+        self._time_units = [m.getTimeUnits() for m in fitted]
+        self._last = [int(m.getLastTimeUpdated()) for m in fitted]
+        self._interval = [int(m.getAverageInterval()) for m in fitted]
+        self._horizon = int(wrapped.prediction_horizon)
+        self.verified = False
+        self.usable = True
+
+    @classmethod
+    def of(cls, wrapped):
+        """The bulk forecaster of wrapped, or None if its models do not see
+        the raw values of X."""
+        if not getattr(wrapped, "is_fitted_", False):
+            return None
+        if wrapped.log_transformed or wrapped.is_exogenous_pipeline_:
+            return None
+        if wrapped.ts_icol_loc != -1 or wrapped.feature_column_indices != -1:
+            return None
+        models = getattr(wrapped, "model", None)
+        if not models or not all(hasattr(m, "_j_fm") for m in models):
+            return None
+        targets = wrapped.target_column_indices
+        if targets == -1:
+            targets = list(range(len(models)))
+        if not isinstance(targets, list) or len(targets) != len(models):
+            return None
+        return cls(wrapped, targets)
+
+    def _restored(self, k):
+        model_class, state = self._states[k]
+        model = model_class.__new__(model_class)
+        model.__setstate__(state)
+        return model._j_fm
+
+    def forecast(self, X):
+        """The forecasts after the rows of X, or None if X is not a non-empty,
+        finite, numeric 2-D array with a column for each target."""
+        if X is None:
+            return None
+        X = np.asarray(X)
+        if X.ndim != 2 or X.dtype.kind not in "biuf" or len(X) == 0:
+            return None
+        if X.shape[1] <= max(self._targets) or not np.isfinite(X).all():
+            return None
+        s = session()
+        steps = np.arange(1, self._horizon + 1)
+        columns = []
+        for k, column in enumerate(self._targets):
+            model = self._restored(k)
+            interval = self._interval[k]
+            timestamps = self._last[k] + interval * np.arange(1, len(X) + 1)
+            model.updateModel(
+                s.timeseries(self._time_units[k], timestamps, X[:, column])
+            )
+            end = int(timestamps[-1])
+            columns.append([model.forecastAt(int(t)) for t in end + interval * steps])
+        return np.array(columns, dtype=float).T
+
+    def predict(self, X):
+        """The forecast of the bulk path, checked against the backend's on
+        first use, or None if the backend has to forecast."""
+        result = self.forecast(X)
+        if result is None or self.verified:
+            return result
+        expected = self._wrapped().predict(X)
+        if np.shape(expected) == result.shape and np.allclose(expected, result):
+            self.verified = True
+            return result
+        self.usable = False
+        return None
+
+
+def forecaster_for(impl):
+    """The bulk forecaster of a trained WatForeForecaster implementation, or
+    None if it does not apply; dropped by discard after each (re)fit."""
+    if impl not in _forecasters:
+        _forecasters[impl] = _BulkForecaster.of(impl._wrapped_model)
+    forecaster = _forecasters[impl]
+    return forecaster if forecaster is not None and forecaster.usable else None
+
+
+def discard(impl):
+    _forecasters.pop(impl, None)
+
+
+def benchmark(trained, X, calls=200):
+    """The mean seconds per predict call of a trained WatForeForecaster on X
+    through the per-value backend and through the bulk path, if it applies."""
+    impl = getattr(trained, "shallow_impl", trained)
+    result = {}
+
+    def time_calls(predict):
+        predict(X)
+        start = time.perf_counter()
+        for _ in range(calls):
+            predict(X)
+        return (time.perf_counter() - start) / calls
+
+    result["backend_seconds"] = time_calls(impl._wrapped_model.predict)
+    forecaster = forecaster_for(impl)
+    if forecaster is not None and forecaster.predict(X) is not None:
+        result["bulk_seconds"] = time_calls(forecaster.forecast)
+    return result